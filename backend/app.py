@@ -1,17 +1,40 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, has_request_context, jsonify, request
 from flask_cors import CORS
 import sqlite3
 import json
+import base64
+import hashlib
 import logging
 import os
-from functools import lru_cache
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
+from urllib.parse import urlencode
+from urllib.request import pathname2url
+from browse_index import BrowseIndexCache
+from compression import encode_body, init_compression, negotiate_encoding, set_encoded_body
+from json_provider import FastJSONProvider
+from metrics import current_route, init_metrics
+from query_profiler import ProfiledConnection, QueryProfiler
+from movie_db import (
+    PEOPLE_ROLES, SEARCH_COLUMNS, SEARCH_MIN_KEYWORD_LENGTH, aggregate_source_query, migrate_database,
+    missing_sort_columns, quote_identifier, table_exists
+)
 
 app = Flask(__name__)
 CORS(app)
 
-# Configure Flask
-app.config['JSON_AS_ASCII'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+# Configure Flask: compact UTF-8 JSON (?pretty=1 for indented output)
+app.json = FastJSONProvider(app)
+
+# Request metrics at /metrics (registered first so latency includes compression)
+metrics = init_metrics(app)
+init_compression(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +43,102 @@ logger = logging.getLogger(__name__)
 # Database path
 DB_PATH = os.path.join(os.path.dirname(__file__), 'movies.db')
 
+# Connection pool configuration (override with environment variables)
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', 256))
+DB_PRAGMAS = {
+    'mmap_size': int(os.environ.get('DB_MMAP_SIZE', 256 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('DB_CACHE_SIZE', -64 * 1024)),  # negative means KiB
+    'temp_store': os.environ.get('DB_TEMP_STORE', 'MEMORY'),
+}
+
+# SQLite statement latency buckets in seconds (statements are mostly well under a millisecond)
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Opt-in statement profiling: timings, slow-query log and query plans
+QUERY_PROFILING = os.environ.get('QUERY_PROFILING', '').lower() in ('1', 'true', 'yes')
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 50))
+
+# Response cache budget in bytes (0 disables caching)
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Parsed movies kept for reuse across endpoints (0 disables the movie cache)
+MOVIE_CACHE_MAX_ENTRIES = int(os.environ.get('MOVIE_CACHE_MAX_ENTRIES', 5000))
+
+# Cached movies measured to estimate the movie cache's memory in its stats
+MOVIE_CACHE_SIZE_SAMPLE = 100
+
+# Seconds a client may reuse a response before revalidating it with If-None-Match
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 0))
+
+# Maximum ids bound into a single download_links IN (...) query
+LINK_BATCH_SIZE = 500
+
+# Related titles shown on the detail page
+RELATED_MOVIES_LIMIT = 8
+
+# Most ids one /api/movies/batch request may resolve
+BATCH_MAX_IDS = int(os.environ.get('BATCH_MAX_IDS', 300))
+
+# bm25() column weights, in movies_fts column order
+SEARCH_BM25_WEIGHTS = ', '.join(str(weight) for weight in SEARCH_COLUMNS.values())
+
+# Listing sort options and the typed, indexed column each one orders by
+SORT_COLUMNS_BY_OPTION = {
+    'publish': 'publish_ts',
+    'year': 'year_int',
+    'imdb': 'imdb_score',
+    'douban': 'douban_score'
+}
+
+# What listings order by when the catalog could not be migrated to the typed columns
+LEGACY_SORT_EXPRESSIONS = {
+    'publish_ts': '{alias}.publish_date',
+    'year_int': "CAST(NULLIF({alias}.year, '') AS INTEGER)",
+    'imdb_score': "CAST(NULLIF(SUBSTR({alias}.imdb_rating, 1, 3), '') AS REAL)",
+    'douban_score': "CAST(NULLIF({alias}.douban_rating, '') AS REAL)"
+}
+
+# Every field of a movie record, in response order
+ALL_FIELDS = [
+    'id', 'title', 'translated_name', 'original_name', 'year', 'country', 'genre', 'genre_list',
+    'language', 'subtitles', 'release_date', 'imdb_rating', 'douban_rating', 'file_format',
+    'video_size', 'file_size', 'duration', 'director', 'cast', 'cast_list', 'synopsis', 'poster',
+    'screenshots', 'category', 'category_type', 'category_name', 'publish_date', 'page_url',
+    'download_links', 'has_magnet', 'has_ftp'
+]
+
+# Fields list endpoints return by default: what a movie card shows
+CARD_FIELDS = [
+    'id', 'title', 'translated_name', 'year', 'country', 'genre', 'genre_list', 'imdb_rating',
+    'douban_rating', 'poster', 'category', 'category_type', 'category_name', 'publish_date',
+    'has_magnet', 'has_ftp'
+]
+
+# Heavier fields list endpoints return on request, e.g. include=links,synopsis
+FIELD_GROUPS = {
+    'links': ['download_links'],
+    'synopsis': ['synopsis'],
+    'cast': ['director', 'cast', 'cast_list'],
+    'screenshots': ['screenshots'],
+    'details': [
+        'original_name', 'language', 'subtitles', 'release_date', 'file_format',
+        'video_size', 'file_size', 'duration', 'page_url'
+    ]
+}
+
+# movies columns each output field is built from (derived fields need none or different ones)
+FIELD_COLUMNS = {field: (field,) for field in ALL_FIELDS}
+FIELD_COLUMNS.update({
+    'genre_list': ('genre',),
+    'cast_list': ('cast',),
+    'category_name': ('category_type', 'category'),
+    'download_links': (),
+    'has_magnet': (),
+    'has_ftp': ()
+})
+
 # Category mappings
 MOVIE_CATEGORIES = {
     '0': '剧情片',
@@ -50,12 +169,468 @@ OTHER_CATEGORIES = {
     'dongman': '动漫资源'
 }
 
+class ConnectionPool:
+    """Pool of persistent read-only SQLite connections shared by worker threads"""
+    
+    def __init__(self, db_path, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 pragmas=None, statement_cache_size=DB_STATEMENT_CACHE_SIZE):
+        self.db_path = db_path
+        self.size = max(size, 1)
+        self.timeout = timeout
+        self.pragmas = dict(DB_PRAGMAS if pragmas is None else pragmas)
+        self.statement_cache_size = statement_cache_size
+        
+        # LIFO so the most recently used (warmest) connection is handed out first
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        
+        # Connections opened before the database file was replaced are retired on release
+        self._generation = 0
+        self._conn_generation = {}
+        
+        # Dedicated connection whose PRAGMA data_version tracks writes by other processes
+        self._probe = None
+        self._probe_lock = threading.Lock()
+        self._file_identity = None
+    
+    def _connect(self):
+        """Open a read-only connection with the tuned pragmas applied"""
+        uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.statement_cache_size,
+            factory=ProfiledConnection
+        )
+        conn.profiler = statement_recorder
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+    
+    def acquire(self):
+        """Check out a connection, opening a new one while under the pool size"""
+        started = time.perf_counter()
+        conn = None
+        
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+                with self._lock:
+                    self._conn_generation[conn] = self._generation
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._timeouts += 1
+                    raise TimeoutError(f"No database connection available after {self.timeout}s")
+        
+        waited = time.perf_counter() - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+            if waited >= 0.001:
+                self._waits += 1
+        return conn
+    
+    def release(self, conn):
+        """Return a connection to the pool"""
+        with self._lock:
+            self._in_use -= 1
+            stale = self._conn_generation.get(conn) != self._generation
+            if stale:
+                self._conn_generation.pop(conn, None)
+                self._created -= 1
+        if stale:
+            conn.close()
+        else:
+            self._idle.put(conn)
+    
+    def close_all(self):
+        """Close idle connections and retire busy ones so every checkout reopens the database"""
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._conn_generation.pop(conn, None)
+                self._created -= 1
+    
+    def data_version(self):
+        """Token that changes whenever the database is written or its file replaced"""
+        try:
+            stat = os.stat(self.db_path)
+        except OSError:
+            return None
+        identity = (stat.st_dev, stat.st_ino)
+        
+        with self._probe_lock:
+            if self._probe is None or identity != self._file_identity:
+                if self._probe is not None:
+                    # A crawler swapped in a new file, pooled connections still see the old one
+                    self._probe.close()
+                    self.close_all()
+                self._probe = self._connect()
+                self._file_identity = identity
+            version = self._probe.execute('PRAGMA data_version').fetchone()[0]
+        
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns, version)
+    
+    def stats(self):
+        """Pool counters for the stats endpoint"""
+        with self._lock:
+            return {
+                'size': self.size,
+                'open_connections': self._created,
+                'in_use': self._in_use,
+                'checkouts': self._checkouts,
+                'waited_checkouts': self._waits,
+                'timeouts': self._timeouts,
+                'avg_wait_ms': round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0,
+                'max_wait_ms': round(self._wait_max * 1000, 3),
+                'pragmas': self.pragmas
+            }
+
+class StatementRecorder:
+    """Reports the statements of pooled connections to the query histogram, and to the profiler when enabled"""
+    
+    def __init__(self, histogram, profiler=None):
+        self.histogram = histogram
+        self.profiler = profiler
+    
+    def record(self, conn, sql, parameters, elapsed):
+        self.histogram.observe(elapsed, route=current_route())
+        if self.profiler is not None:
+            self.profiler.record(conn, sql, parameters, elapsed)
+
+# SQLite metrics: every statement (execution plus fetching) and how long requests hold a connection
+db_query_duration = metrics.histogram(
+    'movie_db_query_duration_seconds', 'SQLite statement latency (execution plus fetching)', ['route'],
+    buckets=QUERY_BUCKETS
+)
+db_connection_hold = metrics.histogram(
+    'movie_db_connection_hold_seconds', 'Time a request holds a pooled connection (queries plus row parsing)', ['route']
+)
+
+query_profiler = QueryProfiler(SLOW_QUERY_MS) if QUERY_PROFILING else None
+statement_recorder = StatementRecorder(db_query_duration, query_profiler)
+db_pool = ConnectionPool(DB_PATH)
+
+# Typed sort columns the catalog lacks, listings order by their legacy expressions instead
+legacy_sort_columns = set()
+
+def init_database():
+    """Apply schema migrations (sort columns, indexes, search) with a short-lived writable connection"""
+    global legacy_sort_columns
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            migrate_database(conn)
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logger.warning(f"Could not migrate database at {DB_PATH}: {e}")
+    
+    try:
+        conn = db_pool.acquire()
+        try:
+            legacy_sort_columns = set(missing_sort_columns(conn))
+        finally:
+            db_pool.release(conn)
+    except sqlite3.Error as e:
+        logger.warning(f"Could not inspect database at {DB_PATH}: {e}")
+    if legacy_sort_columns:
+        logger.warning(
+            f"Database lacks the sort columns {', '.join(sorted(legacy_sort_columns))}, "
+            f"listings fall back to slower unindexed ordering until movie_db.py --db {DB_PATH} migrates it"
+        )
+
+def sort_sql(column, alias='movies'):
+    """SQL of a typed sort column, or of its legacy expression when the catalog lacks the column"""
+    if column in legacy_sort_columns:
+        return LEGACY_SORT_EXPRESSIONS[column].format(alias=alias)
+    return f'{alias}.{column}'
+
+# Listings rely on the typed sort columns, so migrate however this module is loaded
+if os.path.exists(DB_PATH):
+    init_database()
+
+@contextmanager
 def get_db_connection():
-    """Create a database connection"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA query_only = ON")
-    return conn
+    """Check out a pooled database connection for the duration of a block"""
+    conn = db_pool.acquire()
+    started = time.perf_counter()
+    try:
+        yield conn
+    finally:
+        db_connection_hold.observe(time.perf_counter() - started, route=current_route())
+        db_pool.release(conn)
+
+class ResponseCache:
+    """LRU of serialized responses bounded by bytes and dropped whenever the database changes"""
+    
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+    
+    def _check_version(self, version):
+        """Drop every entry once the data version moves on (caller holds the lock)"""
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+    
+    def get(self, key, version):
+        """Cached entry for key, or None"""
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+    
+    def set(self, key, version, entry):
+        """Store an entry ({'body': bytes, ...}) computed against the given data version"""
+        size = len(entry['body'])
+        if version is None or size > self.max_bytes:
+            return
+        with self._lock:
+            self._check_version(version)
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old['body'])
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted['body'])
+                self._evictions += 1
+    
+    def stats(self):
+        """Cache counters for the stats endpoint"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+response_cache = ResponseCache()
+
+def approx_size(value):
+    """Approximate memory held by a parsed movie (dicts, lists and their strings)"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(item) for item in value.values())
+    elif isinstance(value, list):
+        size += sum(approx_size(item) for item in value)
+    return size
+
+class MovieCache:
+    """LRU of built movie dictionaries by (fieldset, id), dropped whenever the database changes
+    
+    Each requested fieldset (the default card, a fields= list, the full detail)
+    is cached separately, so a miss is built from the columns its listing
+    already projected. Cached movies are shared between requests and must not
+    be modified, parse_movie_rows hands out copies.
+    """
+    
+    def __init__(self, max_entries=MOVIE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+    
+    def _check_version(self, version):
+        """Drop every entry once the data version moves on (caller holds the lock)"""
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._version = version
+    
+    def get_many(self, fieldset, ids, version):
+        """{id: movie} of the ids that are cached with the given fieldset"""
+        found = {}
+        with self._lock:
+            self._check_version(version)
+            for movie_id in ids:
+                entry = self._entries.get((fieldset, movie_id))
+                if entry is None:
+                    self._misses += 1
+                    continue
+                self._entries.move_to_end((fieldset, movie_id))
+                self._hits += 1
+                found[movie_id] = entry
+        return found
+    
+    def set_many(self, fieldset, movies, version):
+        """Store movies ({id: movie}) of a fieldset built against the given data version"""
+        if version is None:
+            return
+        with self._lock:
+            self._check_version(version)
+            for movie_id, movie in movies.items():
+                self._entries[(fieldset, movie_id)] = movie
+                self._entries.move_to_end((fieldset, movie_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+    
+    def stats(self):
+        """Cache counters and approximate memory for the stats endpoint"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            # Sized from a sample, measuring every movie on insert costs more than building it
+            sample = list(islice(self._entries.values(), MOVIE_CACHE_SIZE_SAMPLE))
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': len(self._entries) * sum(map(approx_size, sample)) // len(sample) if sample else 0,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': round(self._hits / lookups, 4) if lookups else 0,
+                'evictions': self._evictions,
+                'invalidations': self._invalidations
+            }
+
+movie_cache = MovieCache()
+
+# Filter / facet bitmaps behind /api/browse, rebuilt when the data version changes
+browse_index = BrowseIndexCache()
+
+# Pool and cache metrics
+metrics.expose_stats('movie_db_pool', 'Connection pool', db_pool.stats,
+                     counters=['checkouts', 'waited_checkouts', 'timeouts'],
+                     gauges=['open_connections', 'in_use'])
+metrics.expose_stats('response_cache', 'Response cache', response_cache.stats,
+                     counters=['hits', 'misses', 'evictions', 'invalidations'],
+                     gauges=['entries', 'bytes'])
+metrics.expose_stats('movie_cache', 'Parsed movie cache', movie_cache.stats,
+                     counters=['hits', 'misses', 'evictions', 'invalidations'],
+                     gauges=['entries', 'bytes'])
+
+def current_data_version():
+    """Data version of the catalog, read once per request and shared by the caches it consults"""
+    if not has_request_context():
+        return db_pool.data_version()
+    if 'data_version' not in g:
+        g.data_version = db_pool.data_version()
+    return g.data_version
+
+def request_cache_key():
+    """Cache key for the current request: path plus its query parameters in a stable order"""
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.path}?{query}"
+
+def response_etag(key, version):
+    """Strong ETag of a response: the same data version and request always produce the same bytes"""
+    return hashlib.sha1(f"{version}|{key}".encode('utf-8')).hexdigest()
+
+def set_cache_headers(response, etag):
+    """Validator and freshness headers of a cacheable response"""
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.private = True
+    response.cache_control.max_age = HTTP_CACHE_MAX_AGE
+    if HTTP_CACHE_MAX_AGE <= 0:
+        response.cache_control.no_cache = True
+    return response
+
+def cached_response(view):
+    """Serve a read endpoint from the response cache while the database is unchanged
+    
+    Responses carry an ETag of the data version and request, so a matching
+    If-None-Match is answered with 304 before any SQL runs. Entries are
+    stored per content encoding, already compressed.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Read the version first, a write landing mid-request then invalidates this entry
+        version = current_data_version()
+        if version is None:
+            return view(*args, **kwargs)
+        
+        # Each content encoding is its own entry and representation
+        encoding = negotiate_encoding()
+        key = f"{request_cache_key()}|{encoding}"
+        etag = response_etag(key, version)
+        if request.if_none_match.contains_weak(etag):
+            return set_cache_headers(app.response_class(status=304), etag)
+        
+        entry = response_cache.get(key, version) if response_cache.max_bytes > 0 else None
+        if entry is not None:
+            response = app.response_class(status=entry['status'], mimetype=entry['mimetype'])
+            set_encoded_body(response, entry['body'], entry['encoding'])
+            response.headers['X-Cache'] = 'HIT'
+            return set_cache_headers(response, etag)
+        
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code != 200:
+            return response
+        
+        body, applied = encode_body(response.get_data(), encoding)
+        set_encoded_body(response, body, applied)
+        if response_cache.max_bytes > 0:
+            response_cache.set(key, version, {
+                'body': body,
+                'encoding': applied,
+                'status': response.status_code,
+                'mimetype': response.mimetype
+            })
+            response.headers['X-Cache'] = 'MISS'
+        return set_cache_headers(response, etag)
+    
+    return wrapper
 
 def safe_json_loads(json_str, default=None):
     """Safely parse JSON string"""
@@ -66,105 +641,222 @@ def safe_json_loads(json_str, default=None):
     except:
         return default
 
-def parse_movie_row(row):
-    """Convert database row to movie dictionary"""
+def fetch_download_links(cursor, movie_ids):
+    """Fetch download links for many movies with one query per batch of ids"""
+    links_by_movie = {movie_id: [] for movie_id in movie_ids}
+    movie_ids = list(links_by_movie)
+    
+    for start in range(0, len(movie_ids), LINK_BATCH_SIZE):
+        batch = movie_ids[start:start + LINK_BATCH_SIZE]
+        placeholders = ','.join('?' * len(batch))
+        cursor.execute(f'''
+            SELECT movie_id, quality, link, type
+            FROM download_links 
+            WHERE movie_id IN ({placeholders})
+            ORDER BY 
+                movie_id,
+                CASE type 
+                    WHEN 'magnet' THEN 1 
+                    WHEN 'ftp' THEN 2 
+                    ELSE 3 
+                END,
+                id
+        ''', batch)
+        
+        for link_row in cursor.fetchall():
+            links_by_movie[link_row['movie_id']].append({
+                'quality': link_row['quality'],
+                'link': link_row['link'],
+                'type': link_row['type']
+            })
+    
+    return links_by_movie
+
+def requested_fields(default=CARD_FIELDS):
+    """Output fields for a list endpoint from the fields= / include= query parameters"""
+    fields_param = request.args.get('fields', '')
+    include_param = request.args.get('include', '')
+    
+    if fields_param:
+        wanted = {field.strip() for field in fields_param.split(',')}
+        wanted.add('id')
+    else:
+        wanted = set(default)
+        for group in include_param.split(','):
+            group = group.strip()
+            if group == 'all':
+                wanted.update(ALL_FIELDS)
+            else:
+                wanted.update(FIELD_GROUPS.get(group, []))
+    
+    return [field for field in ALL_FIELDS if field in wanted]
+
+def movie_columns(fields, alias='movies'):
+    """SELECT list loading only the columns the requested fields are built from
+    
+    id and the typed sort columns are always loaded so pages can emit cursors.
+    """
+    sort_columns = list(SORT_COLUMNS_BY_OPTION.values())
+    columns = ['id']
+    for field in fields:
+        for column in FIELD_COLUMNS.get(field, ()):
+            if column not in columns and column not in sort_columns:
+                columns.append(column)
+    
+    select = [f"{alias}.{quote_identifier(column)}" for column in columns]
+    select += [f"{sort_sql(column, alias)} AS {column}" for column in sort_columns]
+    
+    # Without the full link list, answer the convenience flags with index lookups
+    if 'download_links' not in fields:
+        for flag, link_type in (('has_magnet', 'magnet'), ('has_ftp', 'ftp')):
+            if flag in fields:
+                select.append(
+                    f"EXISTS (SELECT 1 FROM download_links WHERE movie_id = {alias}.id AND type = '{link_type}') AS {flag}"
+                )
+    
+    return ', '.join(select)
+
+def build_movie_rows(cursor, rows, fields):
+    """Movie dictionaries of rows holding the columns of movie_columns(fields)"""
+    if 'download_links' not in fields:
+        return [parse_movie_row(row, None, fields) for row in rows]
+    
+    links_by_movie = fetch_download_links(cursor, [row['id'] for row in rows])
+    return [parse_movie_row(row, links_by_movie.get(row['id'], []), fields) for row in rows]
+
+def parse_movie_rows(cursor, rows, fields=ALL_FIELDS):
+    """Convert a page of database rows to movie dictionaries, reusing those the movie cache holds"""
+    if movie_cache.max_entries == 0:
+        return build_movie_rows(cursor, rows, fields)
+    
+    fieldset = tuple(fields)
+    version = current_data_version()
+    movies = movie_cache.get_many(fieldset, [row['id'] for row in rows], version)
+    missing = [row for row in rows if row['id'] not in movies]
+    if missing:
+        built = dict(zip((row['id'] for row in missing), build_movie_rows(cursor, missing, fields)))
+        movie_cache.set_many(fieldset, built, version)
+        movies.update(built)
+    # Cached movies are shared, callers may add to the copies
+    return [dict(movies[row['id']]) for row in rows]
+
+def parse_movie_row(row, download_links, fields=ALL_FIELDS):
+    """Convert database row to movie dictionary holding the requested fields"""
     movie = dict(row)
+    wanted = set(fields)
     
     # Parse JSON fields
-    movie['genre_list'] = safe_json_loads(movie.get('genre'), [])
-    movie['cast_list'] = safe_json_loads(movie.get('cast'), [])
-    movie['screenshots'] = safe_json_loads(movie.get('screenshots'), [])
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get download links
-    cursor.execute('''
-        SELECT quality, link, type
-        FROM download_links 
-        WHERE movie_id = ?
-        ORDER BY 
-            CASE type 
-                WHEN 'magnet' THEN 1 
-                WHEN 'ftp' THEN 2 
-                ELSE 3 
-            END
-    ''', (movie['id'],))
-    
-    download_links = []
-    for link_row in cursor.fetchall():
-        link_data = {
-            'quality': link_row['quality'],
-            'link': link_row['link'],
-            'type': link_row['type']
-        }
-        download_links.append(link_data)
-    
-    conn.close()
+    if 'genre_list' in wanted:
+        movie['genre_list'] = safe_json_loads(movie.get('genre'), [])
+    if 'cast_list' in wanted:
+        movie['cast_list'] = safe_json_loads(movie.get('cast'), [])
+    if 'screenshots' in wanted:
+        movie['screenshots'] = safe_json_loads(movie.get('screenshots'), [])
     
     # Get category name
-    category_name = ''
-    if movie.get('category_type') == 'movie':
-        category_name = MOVIE_CATEGORIES.get(movie.get('category'), '')
-    elif movie.get('category_type') == 'other':
-        category_name = OTHER_CATEGORIES.get(movie.get('category'), '')
+    if 'category_name' in wanted:
+        category_name = ''
+        if movie.get('category_type') == 'movie':
+            category_name = MOVIE_CATEGORIES.get(movie.get('category'), '')
+        elif movie.get('category_type') == 'other':
+            category_name = OTHER_CATEGORIES.get(movie.get('category'), '')
+        movie['category_name'] = category_name
+    
+    # Convenience flags
+    if download_links is not None:
+        movie['download_links'] = download_links
+        movie['has_magnet'] = any(link['type'] == 'magnet' for link in download_links)
+        movie['has_ftp'] = any(link['type'] == 'ftp' for link in download_links)
+    else:
+        movie['has_magnet'] = bool(movie.get('has_magnet'))
+        movie['has_ftp'] = bool(movie.get('has_ftp'))
     
     # Build response
-    return {
-        'id': movie.get('id'),
-        'title': movie.get('title'),
-        'translated_name': movie.get('translated_name'),
-        'original_name': movie.get('original_name'),
-        'year': movie.get('year'),
-        'country': movie.get('country'),
-        'genre': movie.get('genre'),
-        'genre_list': movie.get('genre_list', []),
-        'language': movie.get('language'),
-        'subtitles': movie.get('subtitles'),
-        'release_date': movie.get('release_date'),
-        'imdb_rating': movie.get('imdb_rating'),
-        'douban_rating': movie.get('douban_rating'),
-        'file_format': movie.get('file_format'),
-        'video_size': movie.get('video_size'),
-        'file_size': movie.get('file_size'),
-        'duration': movie.get('duration'),
-        'director': movie.get('director'),
-        'cast': movie.get('cast'),
-        'cast_list': movie.get('cast_list', []),
-        'synopsis': movie.get('synopsis'),
-        'poster': movie.get('poster'),
-        'screenshots': movie.get('screenshots', []),
-        'category': movie.get('category'),
-        'category_type': movie.get('category_type'),
-        'category_name': category_name,
-        'publish_date': movie.get('publish_date'),
-        'page_url': movie.get('page_url'),
-        'download_links': download_links,
-        
-        # Convenience flags
-        'has_magnet': any(link['type'] == 'magnet' for link in download_links),
-        'has_ftp': any(link['type'] == 'ftp' for link in download_links)
-    }
+    return {field: movie.get(field) for field in fields}
+
+def load_aggregates(cursor):
+    """Load the materialized counts as {metric: {(dim1, dim2): value}}"""
+    if table_exists(cursor.connection, 'movie_aggregates'):
+        cursor.execute('SELECT metric, dim1, dim2, value FROM movie_aggregates WHERE value > 0')
+    else:
+        # Catalog not migrated yet, compute the same numbers from the base tables
+        cursor.execute(aggregate_source_query())
+    
+    aggregates = {}
+    for metric, dim1, dim2, value in cursor.fetchall():
+        if value:
+            aggregates.setdefault(metric, {})[(dim1, dim2)] = value
+    return aggregates
+
+def encode_cursor(sort, row):
+    """Build an opaque keyset cursor from the last row of a page"""
+    key = json.dumps([sort, row[SORT_COLUMNS_BY_OPTION[sort]], row['id']], ensure_ascii=False)
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(value, sort):
+    """Decode a keyset cursor into (sort value, id), raising ValueError if malformed"""
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        cursor_sort, sort_value, movie_id = json.loads(base64.urlsafe_b64decode(padded).decode('utf-8'))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if cursor_sort != sort:
+        raise ValueError('Cursor does not match the requested sort')
+    # Legacy publish order (see LEGACY_SORT_EXPRESSIONS) pages by the publish_date text
+    if not isinstance(movie_id, str) or not (sort_value is None or isinstance(sort_value, (int, float, str))):
+        raise ValueError('Invalid cursor')
+    return sort_value, movie_id
+
+def fetch_after_cursor(cursor, columns, conditions, params, sort_column, cursor_key, limit,
+                       source='movies', id_column='id'):
+    """Fetch up to limit rows following a keyset cursor in sort_column DESC, id DESC order
+    
+    Each step is an index range seek, so a deep page costs the same as the first one.
+    """
+    sort_value, movie_id = cursor_key
+    rows = []
+    
+    if sort_value is not None:
+        where = ' AND '.join(conditions + [f'({sort_column}, {id_column}) < (?, ?)'])
+        cursor.execute(f'''
+            SELECT {columns} FROM {source} 
+            WHERE {where}
+            ORDER BY {sort_column} DESC, {id_column} DESC
+            LIMIT ?
+        ''', params + [sort_value, movie_id, limit])
+        rows = cursor.fetchall()
+        movie_id = None
+    
+    # NULLs sort last, so they follow every row that has a value
+    if len(rows) < limit:
+        null_conditions = conditions + [f'{sort_column} IS NULL']
+        null_params = list(params)
+        if movie_id is not None:
+            null_conditions.append(f'{id_column} < ?')
+            null_params.append(movie_id)
+        cursor.execute(f'''
+            SELECT {columns} FROM {source} 
+            WHERE {' AND '.join(null_conditions)}
+            ORDER BY {id_column} DESC
+            LIMIT ?
+        ''', null_params + [limit - len(rows)])
+        rows = rows + cursor.fetchall()
+    
+    return rows
 
 @app.route('/api/categories', methods=['GET'])
+@cached_response
 def get_categories():
     """Get all categories with counts"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get counts by category
-    cursor.execute('''
-        SELECT category, category_type, COUNT(*) as count 
-        FROM movies 
-        GROUP BY category, category_type
-    ''')
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get counts by category
+        aggregates = load_aggregates(cursor)
     
     category_counts = {}
-    for row in cursor.fetchall():
-        key = f"{row['category_type']}_{row['category']}"
-        category_counts[key] = row['count']
-    
-    conn.close()
+    for (cat_type, cat), count in aggregates.get('category', {}).items():
+        category_counts[f"{cat_type}_{cat}"] = count
     
     # Build response
     categories = {
@@ -196,50 +888,67 @@ def get_categories():
     })
 
 @app.route('/api/movies/<category_type>/<category>', methods=['GET'])
+@cached_response
 def get_movies_by_category(category_type, category):
     """Get movies by category type and ID"""
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 30, type=int)
     sort = request.args.get('sort', 'publish')  # publish, year, rating
+    after = request.args.get('cursor', '')
+    fields = requested_fields()
     
     # Validate
     per_page = min(max(per_page, 1), 100)
     
     # Sort options
-    sort_options = {
-        'publish': 'publish_date DESC, id DESC',
-        'year': 'publish_date DESC, year DESC',
-        'imdb': 'publish_date DESC, CAST(SUBSTR(imdb_rating, 1, 3) AS REAL) DESC',
-        'douban': 'publish_date DESC, CAST(douban_rating AS REAL) DESC'
-    }
-    order_by = sort_options.get(sort, sort_options['publish'])
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get total count
-    cursor.execute('''
-        SELECT COUNT(*) as total 
-        FROM movies 
-        WHERE category_type = ? AND category = ?
-    ''', (category_type, category))
-    total = cursor.fetchone()['total']
-    total_pages = (total + per_page - 1) // per_page
-    
-    # Get movies
-    offset = (page - 1) * per_page
-    cursor.execute(f'''
-        SELECT * FROM movies 
-        WHERE category_type = ? AND category = ?
-        ORDER BY {order_by}
-        LIMIT ? OFFSET ?
-    ''', (category_type, category, per_page, offset))
-    
-    movies = []
-    for row in cursor.fetchall():
-        movies.append(parse_movie_row(row))
-    
-    conn.close()
+    if sort not in SORT_COLUMNS_BY_OPTION:
+        sort = 'publish'
+    sort_column = sort_sql(SORT_COLUMNS_BY_OPTION[sort])
+    
+    cursor_key = None
+    if after:
+        try:
+            cursor_key = decode_cursor(after, sort)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # Get total count
+        cursor.execute('''
+            SELECT COUNT(*) as total 
+            FROM movies 
+            WHERE category_type = ? AND category = ?
+        ''', (category_type, category))
+        total = cursor.fetchone()['total']
+        total_pages = (total + per_page - 1) // per_page
+        
+        # Get movies, one extra row tells whether another page follows
+        if cursor_key:
+            rows = fetch_after_cursor(
+                cursor, movie_columns(fields), ['category_type = ?', 'category = ?'], [category_type, category],
+                sort_column, cursor_key, per_page + 1
+            )
+        else:
+            offset = (page - 1) * per_page
+            cursor.execute(f'''
+                SELECT {movie_columns(fields)} FROM movies 
+                WHERE category_type = ? AND category = ?
+                ORDER BY {sort_column} DESC, id DESC
+                LIMIT ? OFFSET ?
+            ''', (category_type, category, per_page + 1, offset))
+            rows = cursor.fetchall()
+        
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        
+        movies = parse_movie_rows(cursor, rows, fields)
+    
+    next_cursor = encode_cursor(sort, rows[-1]) if has_next else None
     
     # Get category name
     category_name = ''
@@ -260,62 +969,367 @@ def get_movies_by_category(category_type, category):
                 'total_pages': total_pages,
                 'total_movies': total,
                 'per_page': per_page,
-                'has_next': page < total_pages,
-                'has_prev': page > 1
+                'has_next': has_next,
+                'has_prev': page > 1 or cursor_key is not None,
+                'next_cursor': next_cursor
             },
             'sort': sort
         }
     })
 
 @app.route('/api/movie/<movie_id>', methods=['GET'])
+@cached_response
 def get_movie_detail(movie_id):
     """Get single movie detail"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    fields = requested_fields()
     
-    cursor.execute('SELECT * FROM movies WHERE id = ?', (movie_id,))
-    row = cursor.fetchone()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT * FROM movies WHERE id = ?', (movie_id,))
+        row = cursor.fetchone()
+        
+        if not row:
+            return jsonify({
+                'status': 'error',
+                'message': 'Movie not found'
+            }), 404
+        
+        movie = parse_movie_rows(cursor, [row])[0]
+        
+        # Related titles precomputed by `movie_db.py --rebuild-neighbors`
+        related_rows = []
+        if table_exists(conn, 'movie_neighbors'):
+            cursor.execute(f'''
+                SELECT {movie_columns(fields)} FROM movie_neighbors
+                JOIN movies ON movies.id = movie_neighbors.neighbor_id
+                WHERE movie_neighbors.movie_id = ?
+                ORDER BY movie_neighbors.rank
+                LIMIT ?
+            ''', (movie_id, RELATED_MOVIES_LIMIT))
+            related_rows = cursor.fetchall()
+        
+        # Titles crawled since the last rebuild fall back to the newest of their category
+        if not related_rows:
+            cursor.execute(f'''
+                SELECT {movie_columns(fields)} FROM movies 
+                WHERE category_type = ? AND category = ? AND id != ?
+                ORDER BY {sort_sql('publish_ts')} DESC, id DESC
+                LIMIT ?
+            ''', (row['category_type'], row['category'], movie_id, RELATED_MOVIES_LIMIT))
+            related_rows = cursor.fetchall()
+        
+        related = parse_movie_rows(cursor, related_rows, fields)
+    
+    movie['related_movies'] = related
     
-    if not row:
-        conn.close()
+    return jsonify({
+        'status': 'success',
+        'data': movie
+    })
+
+def batch_movies_response(ids):
+    """Movies for a list of ids in request order, None where an id is unknown"""
+    ids = [str(movie_id).strip() for movie_id in ids if str(movie_id).strip()]
+    if not ids:
         return jsonify({
             'status': 'error',
-            'message': 'Movie not found'
-        }), 404
+            'message': 'ids is required'
+        }), 400
+    if len(ids) > BATCH_MAX_IDS:
+        return jsonify({
+            'status': 'error',
+            'message': f'At most {BATCH_MAX_IDS} ids per request'
+        }), 400
     
-    movie = parse_movie_row(row)
+    fields = requested_fields(default=ALL_FIELDS)
+    unique_ids = list(dict.fromkeys(ids))
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        placeholders = ','.join('?' * len(unique_ids))
+        cursor.execute(f'SELECT {movie_columns(fields)} FROM movies WHERE id IN ({placeholders})', unique_ids)
+        movies = {movie['id']: movie for movie in parse_movie_rows(cursor, cursor.fetchall(), fields)}
+    
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'movies': [movies.get(movie_id) for movie_id in ids],
+            'not_found': [movie_id for movie_id in unique_ids if movie_id not in movies],
+            'count': len(movies)
+        }
+    })
+
+@app.route('/api/movies/batch', methods=['GET'])
+@cached_response
+def get_movies_batch():
+    """Get several movies by id (?ids=1,2,3)"""
+    return batch_movies_response(request.args.get('ids', '').split(','))
+
+@app.route('/api/movies/batch', methods=['POST'])
+def post_movies_batch():
+    """Get several movies by id from a JSON body ({"ids": [...]})"""
+    payload = request.get_json(silent=True) or {}
+    ids = payload.get('ids') if isinstance(payload, dict) else None
+    if not isinstance(ids, list):
+        return jsonify({
+            'status': 'error',
+            'message': 'Body must be a JSON object with an ids list'
+        }), 400
+    return batch_movies_response(ids)
+
+
+
+
+def tagged_movies_page(cursor, table, conditions, params, fields, page, per_page, cursor_key):
+    """One page of movies listed through a join table (movie_genres / movie_people) in publish order
+    
+    Returns (rows, total, has_next). The join table's (key, publish_ts, movie_id)
+    index serves every page, including cursor pages, without a sort.
+    """
+    where = ' AND '.join(conditions)
+    cursor.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', params)
+    total = cursor.fetchone()[0]
+    
+    source = f'{table} JOIN movies ON movies.id = {table}.movie_id'
+    sort_column, id_column = f'{table}.publish_ts', f'{table}.movie_id'
+    if cursor_key:
+        rows = fetch_after_cursor(
+            cursor, movie_columns(fields), conditions, params,
+            sort_column, cursor_key, per_page + 1, source=source, id_column=id_column
+        )
+    else:
+        cursor.execute(f'''
+            SELECT {movie_columns(fields)} FROM {source}
+            WHERE {where}
+            ORDER BY {sort_column} DESC, {id_column} DESC
+            LIMIT ? OFFSET ?
+        ''', params + [per_page + 1, (page - 1) * per_page])
+        rows = cursor.fetchall()
+    
+    return rows[:per_page], total, len(rows) > per_page
+
+def tag_listing_args():
+    """(page, per_page, cursor key, fields) of a genre / person listing, raising ValueError on a bad cursor"""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 30, type=int), 1), 100)
+    after = request.args.get('cursor', '')
+    cursor_key = decode_cursor(after, 'publish') if after else None
+    return page, per_page, cursor_key, requested_fields()
+
+def tag_pagination(page, per_page, total, has_next, cursor_key, rows):
+    """Pagination block shared by the genre and person listings"""
+    return {
+        'current_page': page,
+        'total_pages': (total + per_page - 1) // per_page,
+        'total_movies': total,
+        'per_page': per_page,
+        'has_next': has_next,
+        'has_prev': page > 1 or cursor_key is not None,
+        'next_cursor': encode_cursor('publish', rows[-1]) if has_next else None
+    }
+
+@app.route('/api/genre/<name>', methods=['GET'])
+@cached_response
+def get_movies_by_genre(name):
+    """Get movies of a genre, newest first"""
+    try:
+        page, per_page, cursor_key, fields = tag_listing_args()
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
     
-    # Get related movies
-    cursor.execute('''
-        SELECT * FROM movies 
-        WHERE category_type = ? AND category = ? AND id != ?
-        ORDER BY publish_date DESC, RANDOM()
-        LIMIT 8
-    ''', (row['category_type'], row['category'], movie_id))
+    with get_db_connection() as conn:
+        if not table_exists(conn, 'movie_genres'):
+            return jsonify({
+                'status': 'error',
+                'message': 'Genre index not built, run movie_db.py --db <path>'
+            }), 503
+        
+        cursor = conn.cursor()
+        rows, total, has_next = tagged_movies_page(
+            cursor, 'movie_genres', ['movie_genres.genre = ?'], [name], fields, page, per_page, cursor_key
+        )
+        movies = parse_movie_rows(cursor, rows, fields)
     
-    related = []
-    for related_row in cursor.fetchall():
-        related.append(parse_movie_row(related_row))
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'genre': name,
+            'movies': movies,
+            'pagination': tag_pagination(page, per_page, total, has_next, cursor_key, rows)
+        }
+    })
+
+@app.route('/api/person/<name>', methods=['GET'])
+@cached_response
+def get_movies_by_person(name):
+    """Get movies a person directed or appears in, newest first"""
+    role = request.args.get('role', '')
+    if role and role not in PEOPLE_ROLES:
+        return jsonify({
+            'status': 'error',
+            'message': f"role must be one of {', '.join(PEOPLE_ROLES)}"
+        }), 400
     
-    conn.close()
+    try:
+        page, per_page, cursor_key, fields = tag_listing_args()
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
     
-    movie['related_movies'] = related
+    with get_db_connection() as conn:
+        if not table_exists(conn, 'movie_people'):
+            return jsonify({
+                'status': 'error',
+                'message': 'People index not built, run movie_db.py --db <path>'
+            }), 503
+        
+        cursor = conn.cursor()
+        cursor.execute('SELECT id FROM people WHERE name = ?', (name,))
+        person = cursor.fetchone()
+        if not person:
+            return jsonify({
+                'status': 'error',
+                'message': 'Person not found'
+            }), 404
+        
+        conditions = ['movie_people.person_id = ?']
+        params = [person['id']]
+        if role:
+            conditions.append('movie_people.role = ?')
+            params.append(role)
+        else:
+            # One row per movie: skip the cast credit of a film the person also directed
+            conditions.append('''(movie_people.role = 'director' OR NOT EXISTS (
+                SELECT 1 FROM movie_people AS director_credit
+                WHERE director_credit.person_id = movie_people.person_id
+                AND director_credit.role = 'director' AND director_credit.movie_id = movie_people.movie_id
+            ))''')
+        
+        rows, total, has_next = tagged_movies_page(
+            cursor, 'movie_people', conditions, params, fields, page, per_page, cursor_key
+        )
+        movies = parse_movie_rows(cursor, rows, fields)
+        
+        # Every role the person has in each listed movie
+        roles = {}
+        if movies:
+            ids = [movie['id'] for movie in movies]
+            cursor.execute(f'''
+                SELECT movie_id, role FROM movie_people
+                WHERE person_id = ? AND movie_id IN ({','.join('?' * len(ids))})
+            ''', [person['id']] + ids)
+            for credit in cursor.fetchall():
+                roles.setdefault(credit['movie_id'], []).append(credit['role'])
+    
+    for movie in movies:
+        movie['roles'] = sorted(roles.get(movie['id'], []), key=PEOPLE_ROLES.index)
     
     return jsonify({
         'status': 'success',
-        'data': movie
+        'data': {
+            'person': name,
+            'role': role or 'all',
+            'movies': movies,
+            'pagination': tag_pagination(page, per_page, total, has_next, cursor_key, rows)
+        }
     })
 
+def browse_list_arg(name):
+    """Distinct non-empty values of a comma-separated query parameter"""
+    return list(dict.fromkeys(value.strip() for value in request.args.get(name, '').split(',') if value.strip()))
 
+def browse_number_arg(name, convert):
+    """Optional numeric query parameter, raising ValueError when malformed"""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return convert(value)
+    except ValueError:
+        raise ValueError(f'{name} must be a number')
 
+@app.route('/api/browse', methods=['GET'])
+@cached_response
+def browse_movies():
+    """Browse movies by combined filters, newest first, with facet counts of the result"""
+    try:
+        filters = {
+            'category_type': request.args.get('type', '').strip() or None,
+            'category': request.args.get('category', '').strip() or None,
+            'genres': browse_list_arg('genre'),
+            'countries': browse_list_arg('country'),
+            'languages': browse_list_arg('language'),
+            'year_from': browse_number_arg('year_from', int),
+            'year_to': browse_number_arg('year_to', int),
+            'min_imdb': browse_number_arg('min_imdb', float),
+            'min_douban': browse_number_arg('min_douban', float),
+            'has_magnet': request.args.get('has_magnet', '').lower() in ('1', 'true', 'yes')
+        }
+    except ValueError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 30, type=int), 1), 100)
+    fields = requested_fields()
+    version = current_data_version()
+    
+    with get_db_connection() as conn:
+        if not table_exists(conn, 'movie_genres'):
+            return jsonify({
+                'status': 'error',
+                'message': 'Genre index not built, run movie_db.py --db <path>'
+            }), 503
+        
+        index = browse_index.get(conn, version)
+        result = index.filter(**filters)
+        total = result.bit_count()
+        ids = index.page(result, (page - 1) * per_page, per_page)
+        
+        movies = []
+        if ids:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {movie_columns(fields)} FROM movies WHERE id IN ({','.join('?' * len(ids))})", ids
+            )
+            by_id = {movie['id']: movie for movie in parse_movie_rows(cursor, cursor.fetchall(), fields)}
+            movies = [by_id[movie_id] for movie_id in ids if movie_id in by_id]
+    
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'filters': {name: value for name, value in filters.items() if value not in (None, [], False)},
+            'movies': movies,
+            'facets': index.facets(result),
+            'pagination': {
+                'current_page': page,
+                'total_pages': (total + per_page - 1) // per_page,
+                'total_movies': total,
+                'per_page': per_page,
+                'has_next': page * per_page < total,
+                'has_prev': page > 1
+            }
+        }
+    })
 
 @app.route('/api/search', methods=['GET'])
+@cached_response
 def search_movies():
     """Search movies"""
     keyword = request.args.get('keyword', '').strip()
     category_type = request.args.get('type', '')  # movie, other, or empty for all
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 30, type=int)
+    fields = requested_fields()
     
     if not keyword:
         return jsonify({
@@ -325,53 +1339,73 @@ def search_movies():
     
     per_page = min(max(per_page, 1), 100)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Build query
-    search_pattern = f'%{keyword}%'
-    
-    # Build search query with proper parameter placeholders
-    search_conditions = "(title LIKE ? OR translated_name LIKE ? OR original_name LIKE ? OR director LIKE ? OR \"cast\" LIKE ? OR synopsis LIKE ? OR genre LIKE ? OR country LIKE ?)"
-    
-    # Set up parameters for the search
-    params = [search_pattern] * 8
-    
-    # Build complete WHERE clause
-    if category_type:
-        query_count = 'SELECT COUNT(*) as total FROM movies WHERE ' + search_conditions + ' AND category_type = ?'
-        query_select = 'SELECT * FROM movies WHERE ' + search_conditions + ' AND category_type = ? ORDER BY publish_date DESC LIMIT ? OFFSET ?'
-        params.append(category_type)
-    else:
-        query_count = 'SELECT COUNT(*) as total FROM movies WHERE ' + search_conditions
-        query_select = 'SELECT * FROM movies WHERE ' + search_conditions + ' ORDER BY publish_date DESC LIMIT ? OFFSET ?'
-    
-    # Get total
-    cursor.execute(query_count, params)
-    total = cursor.fetchone()['total']
-    total_pages = (total + per_page - 1) // per_page
-    
-    # Get results
-    offset = (page - 1) * per_page
-    # Rebuild params for the select query (need to add limit and offset)
-    select_params = [search_pattern] * 8
-    if category_type:
-        select_params.append(category_type)
-    select_params.extend([per_page, offset])
-    
-    cursor.execute(query_select, select_params)
-    
-    movies = []
-    for row in cursor.fetchall():
-        movies.append(parse_movie_row(row))
-    
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        offset = (page - 1) * per_page
+        
+        if len(keyword) >= SEARCH_MIN_KEYWORD_LENGTH and table_exists(conn, 'movie_search_keys'):
+            search_mode = 'fulltext'
+            
+            # Match the keyword as a phrase, which the trigram tokenizer treats as a substring
+            match_query = '"' + keyword.replace('"', '""') + '"'
+            params = [match_query]
+            type_filter = ''
+            if category_type:
+                type_filter = ' AND m.category_type = ?'
+                params.append(category_type)
+            
+            cursor.execute('''
+                SELECT COUNT(*) as total
+                FROM movies_fts
+                JOIN movie_search_keys k ON k.id = movies_fts.rowid
+                JOIN movies m ON m.id = k.movie_id
+                WHERE movies_fts MATCH ?''' + type_filter, params)
+            total = cursor.fetchone()['total']
+            
+            cursor.execute(f'''
+                SELECT {movie_columns(fields, 'm')}
+                FROM movies_fts
+                JOIN movie_search_keys k ON k.id = movies_fts.rowid
+                JOIN movies m ON m.id = k.movie_id
+                WHERE movies_fts MATCH ?{type_filter}
+                ORDER BY bm25(movies_fts, {SEARCH_BM25_WEIGHTS}), {sort_sql('publish_ts', 'm')} DESC
+                LIMIT ? OFFSET ?
+            ''', params + [per_page, offset])
+            rows = cursor.fetchall()
+        else:
+            # Keywords too short for the trigram index (or no index yet) scan with LIKE
+            search_mode = 'scan'
+            search_pattern = f'%{keyword}%'
+            search_conditions = "(title LIKE ? OR translated_name LIKE ? OR original_name LIKE ? OR director LIKE ? OR \"cast\" LIKE ? OR synopsis LIKE ? OR genre LIKE ? OR country LIKE ?)"
+            params = [search_pattern] * 8
+            if category_type:
+                search_conditions += ' AND category_type = ?'
+                params.append(category_type)
+            
+            # One scan for the page and the count, carried on every row of the page
+            cursor.execute(
+                'SELECT ' + movie_columns(fields) + ', COUNT(*) OVER () AS total_matches FROM movies WHERE '
+                + search_conditions + f" ORDER BY {sort_sql('publish_ts')} DESC, id DESC LIMIT ? OFFSET ?",
+                params + [per_page, offset]
+            )
+            rows = cursor.fetchall()
+            if rows:
+                total = rows[0]['total_matches']
+            else:
+                # Past the last page the scan returns no row to read the count from
+                cursor.execute('SELECT COUNT(*) as total FROM movies WHERE ' + search_conditions, params)
+                total = cursor.fetchone()['total']
+        
+        total_pages = (total + per_page - 1) // per_page
+        movies = parse_movie_rows(cursor, rows, fields)
     
     return jsonify({
         'status': 'success',
         'data': {
             'keyword': keyword,
             'category_type': category_type,
+            'search_mode': search_mode,
             'movies': movies,
             'pagination': {
                 'current_page': page,
@@ -385,124 +1419,134 @@ def search_movies():
     })
 
 @app.route('/api/latest', methods=['GET'])
+@cached_response
 def get_latest_movies():
     """Get latest movies"""
     category_type = request.args.get('type', '')  # movie, other, or empty for all
     limit = request.args.get('limit', 30, type=int)
+    after = request.args.get('cursor', '')
+    fields = requested_fields()
     
     limit = min(max(limit, 1), 100)
     
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    cursor_key = None
+    if after:
+        try:
+            cursor_key = decode_cursor(after, 'publish')
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+    
+    conditions = []
+    params = []
     if category_type:
-        cursor.execute('''
-            SELECT * FROM movies 
-            WHERE category_type = ?
-            ORDER BY publish_date DESC, id DESC
-            LIMIT ?
-        ''', (category_type, limit))
-    else:
-        cursor.execute('''
-            SELECT * FROM movies 
-            ORDER BY publish_date DESC, id DESC
-            LIMIT ?
-        ''', (limit,))
-    
-    movies = []
-    for row in cursor.fetchall():
-        movies.append(parse_movie_row(row))
+        conditions.append('category_type = ?')
+        params.append(category_type)
     
-    conn.close()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        if cursor_key:
+            rows = fetch_after_cursor(
+                cursor, movie_columns(fields), conditions, params, sort_sql('publish_ts'), cursor_key, limit + 1
+            )
+        else:
+            where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+            cursor.execute(f'''
+                SELECT {movie_columns(fields)} FROM movies 
+                {where}
+                ORDER BY {sort_sql('publish_ts')} DESC, id DESC
+                LIMIT ?
+            ''', params + [limit + 1])
+            rows = cursor.fetchall()
+        
+        has_next = len(rows) > limit
+        rows = rows[:limit]
+        
+        movies = parse_movie_rows(cursor, rows, fields)
     
     return jsonify({
         'status': 'success',
         'data': {
             'movies': movies,
             'total': len(movies),
-            'category_type': category_type
+            'category_type': category_type,
+            'next_cursor': encode_cursor('publish', rows[-1]) if has_next else None
         }
     })
 
 @app.route('/api/home', methods=['GET'])
+@cached_response
 def get_home_data():
     """Get home page data"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    sections = []
-    
-    # Latest releases
-    cursor.execute('''
-        SELECT * FROM movies 
-        ORDER BY publish_date DESC, id DESC
-        LIMIT 12
-    ''')
-    latest_movies = []
-    for row in cursor.fetchall():
-        latest_movies.append(parse_movie_row(row))
-    
-    if latest_movies:
-        sections.append({
-            'title': '最新发布 Latest Releases',
-            'type': 'latest',
-            'movies': latest_movies
-        })
+    fields = requested_fields()
     
-    # Popular movie categories
-    popular_movie_cats = ['2', '15', '4', '1', '8']  # Action, Crime, Sci-fi, Comedy, Horror
-    for cat_id in popular_movie_cats:
-        cursor.execute('''
-            SELECT * FROM movies 
-            WHERE category_type = 'movie' AND category = ?
-            ORDER BY 
-                publish_date DESC,
-                CASE 
-                    WHEN imdb_rating IS NOT NULL AND imdb_rating != '' 
-                    THEN CAST(SUBSTR(imdb_rating, 1, 3) AS REAL) 
-                    ELSE 0 
-                END DESC
-            LIMIT 12
-        ''', (cat_id,))
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
         
-        cat_movies = []
-        for row in cursor.fetchall():
-            cat_movies.append(parse_movie_row(row))
+        sections = []
         
-        if cat_movies:
+        # Latest releases, flagging the ones complete enough to be featured
+        cursor.execute(f'''
+            SELECT 
+                {movie_columns(fields)},
+                (
+                    COALESCE(poster, '') != '' AND COALESCE(synopsis, '') != ''
+                    AND (COALESCE(imdb_rating, '') != '' OR COALESCE(douban_rating, '') != '')
+                ) AS featurable
+            FROM movies 
+            ORDER BY {sort_sql('publish_ts')} DESC, id DESC
+            LIMIT 12
+        ''')
+        latest_rows = cursor.fetchall()
+        latest_movies = parse_movie_rows(cursor, latest_rows, fields)
+        
+        if latest_movies:
             sections.append({
-                'title': f"{MOVIE_CATEGORIES.get(cat_id, 'Movies')}",
-                'type': 'movie',
-                'category': cat_id,
-                'movies': cat_movies
+                'title': '最新发布 Latest Releases',
+                'type': 'latest',
+                'movies': latest_movies
             })
-    
-    
-    # Statistics
-    cursor.execute('''
-        SELECT 
-            COUNT(*) as total_movies,
-            COUNT(DISTINCT category) as total_categories,
-            COUNT(CASE WHEN category_type = 'movie' THEN 1 END) as total_movies_type,
-            COUNT(CASE WHEN imdb_rating IS NOT NULL AND imdb_rating != '' THEN 1 END) as with_imdb,
-            COUNT(CASE WHEN douban_rating IS NOT NULL AND douban_rating != '' THEN 1 END) as with_douban
-        FROM movies
-    ''')
-    stats = dict(cursor.fetchone())
-    
-    conn.close()
-    
-    # Pick featured movie
-    featured = None
-    if latest_movies:
-        # Prefer movie with poster and good rating
-        for movie in latest_movies:
-            if movie.get('poster') and movie.get('synopsis'):
-                if movie.get('imdb_rating') or movie.get('douban_rating'):
-                    featured = movie
-                    break
-        if not featured:
-            featured = latest_movies[0]
+        
+        # Popular movie categories
+        popular_movie_cats = ['2', '15', '4', '1', '8']  # Action, Crime, Sci-fi, Comedy, Horror
+        for cat_id in popular_movie_cats:
+            cursor.execute(f'''
+                SELECT {movie_columns(fields)} FROM movies 
+                WHERE category_type = 'movie' AND category = ?
+                ORDER BY {sort_sql('publish_ts')} DESC, {sort_sql('imdb_score')} DESC
+                LIMIT 12
+            ''', (cat_id,))
+        
+            cat_movies = parse_movie_rows(cursor, cursor.fetchall(), fields)
+        
+            if cat_movies:
+                sections.append({
+                    'title': f"{MOVIE_CATEGORIES.get(cat_id, 'Movies')}",
+                    'type': 'movie',
+                    'category': cat_id,
+                    'movies': cat_movies
+                })
+        
+        # Pick featured movie: prefer one with poster, synopsis and a rating
+        featured = None
+        if latest_rows:
+            featured_row = next((row for row in latest_rows if row['featurable']), latest_rows[0])
+            cursor.execute('SELECT * FROM movies WHERE id = ?', (featured_row['id'],))
+            featured = parse_movie_rows(cursor, cursor.fetchall())[0]
+        
+        # Statistics
+        aggregates = load_aggregates(cursor)
+    
+    stats = {
+        'total_movies': aggregates.get('movies', {}).get(('', ''), 0),
+        'total_categories': len({cat for _, cat in aggregates.get('category', {})}),
+        'total_movies_type': aggregates.get('type', {}).get(('movie', ''), 0),
+        'with_imdb': aggregates.get('imdb', {}).get(('', ''), 0),
+        'with_douban': aggregates.get('douban', {}).get(('', ''), 0)
+    }
     
     return jsonify({
         'status': 'success',
@@ -513,67 +1557,88 @@ def get_home_data():
         }
     })
 
+@app.route('/api/admin/slow-queries', methods=['GET', 'DELETE'])
+def get_slow_queries():
+    """Top-N statements by time with their query plans (local requests only)"""
+    if request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({
+            'status': 'error',
+            'message': 'Admin endpoints are only available locally'
+        }), 403
+    
+    if query_profiler is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Query profiling is disabled, start the API with QUERY_PROFILING=1'
+        }), 404
+    
+    if request.method == 'DELETE':
+        query_profiler.reset()
+        return jsonify({'status': 'success'})
+    
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 500)
+    order = request.args.get('sort', 'total')
+    if order not in ('total', 'max', 'mean'):
+        return jsonify({
+            'status': 'error',
+            'message': 'sort must be one of total, max, mean'
+        }), 400
+    
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'slow_query_ms': query_profiler.slow_ms,
+            'statements': query_profiler.top(limit, f'{order}_ms')
+        }
+    })
+
 @app.route('/api/stats', methods=['GET'])
 def get_statistics():
     """Get database statistics"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        
+        aggregates = load_aggregates(cursor)
     
     # Overall stats
-    cursor.execute('''
-        SELECT 
-            COUNT(*) as total,
-            COUNT(DISTINCT category) as categories,
-            COUNT(DISTINCT year) as years,
-            MIN(year) as min_year,
-            MAX(year) as max_year
-        FROM movies
-    ''')
-    overall = dict(cursor.fetchone())
+    years = sorted(year for year, _ in aggregates.get('year', {}))
+    overall = {
+        'total': aggregates.get('movies', {}).get(('', ''), 0),
+        'categories': len({cat for _, cat in aggregates.get('category', {})}),
+        'years': len(years),
+        'min_year': years[0] if years else None,
+        'max_year': years[-1] if years else None
+    }
     
     # By type
-    cursor.execute('''
-        SELECT category_type, COUNT(*) as count 
-        FROM movies 
-        GROUP BY category_type
-    ''')
     by_type = []
-    for row in cursor.fetchall():
-        by_type.append(dict(row))
-    
+    for (cat_type, _), count in sorted(aggregates.get('type', {}).items()):
+        by_type.append({'category_type': cat_type, 'count': count})
     
     # Top categories
-    cursor.execute('''
-        SELECT category, category_type, COUNT(*) as count 
-        FROM movies 
-        GROUP BY category, category_type
-        ORDER BY count DESC
-        LIMIT 10
-    ''')
+    category_counts = sorted(
+        aggregates.get('category', {}).items(),
+        key=lambda item: (-item[1], item[0][1], item[0][0])
+    )
     top_categories = []
-    for row in cursor.fetchall():
-        item = dict(row)
+    for (cat_type, cat), count in category_counts[:10]:
+        item = {'category': cat, 'category_type': cat_type, 'count': count}
         # Add category name
-        if item['category_type'] == 'movie':
-            item['name'] = MOVIE_CATEGORIES.get(item['category'], item['category'])
+        if cat_type == 'movie':
+            item['name'] = MOVIE_CATEGORIES.get(cat, cat)
         else:
-            item['name'] = OTHER_CATEGORIES.get(item['category'], item['category'])
+            item['name'] = OTHER_CATEGORIES.get(cat, cat)
         top_categories.append(item)
     
     # Link types
-    cursor.execute('''
-        SELECT 
-            type, 
-            COUNT(DISTINCT movie_id) as movies,
-            COUNT(*) as total_links
-        FROM download_links 
-        GROUP BY type
-    ''')
+    link_movies = aggregates.get('link_movies', {})
     link_types = []
-    for row in cursor.fetchall():
-        link_types.append(dict(row))
-    
-    conn.close()
+    for (link_type, _), total_links in sorted(aggregates.get('link_links', {}).items()):
+        link_types.append({
+            'type': link_type,
+            'movies': link_movies.get((link_type, ''), 0),
+            'total_links': total_links
+        })
     
     return jsonify({
         'status': 'success',
@@ -585,10 +1650,20 @@ def get_statistics():
             'database': {
                 'path': DB_PATH,
                 'size_mb': round(os.path.getsize(DB_PATH) / (1024 * 1024), 2) if os.path.exists(DB_PATH) else 0
-            }
+            },
+            'connection_pool': db_pool.stats(),
+            'response_cache': response_cache.stats(),
+            'movie_cache': movie_cache.stats(),
+            'browse_index': browse_index.stats()
         }
     })
 
+# List endpoints return movie cards unless asked for more
+FIELDS_PARAMETER_DOC = {
+    'include': 'Extra field groups on top of the card fields: ' + ', '.join(list(FIELD_GROUPS) + ['all']),
+    'fields': 'Comma-separated list of exact fields to return (overrides include)'
+}
+
 @app.route('/', methods=['GET'])
 def home():
     """API documentation"""
@@ -615,23 +1690,81 @@ def home():
                     'category': 'Category ID',
                     'page': 'Page number (default: 1)',
                     'per_page': 'Items per page (default: 30, max: 100)',
-                    'sort': 'Sort by: publish, year, imdb, douban'
+                    'sort': 'Sort by: publish, year, imdb, douban (newest/highest first)',
+                    'cursor': 'Opaque next_cursor from the previous page, replaces page',
+                    'include': FIELDS_PARAMETER_DOC['include'],
+                    'fields': FIELDS_PARAMETER_DOC['fields']
                 },
                 'example': '/api/movies/movie/15?page=1&sort=imdb'
             },
             'movie_detail': {
                 'url': '/api/movie/<movie_id>',
-                'description': 'Get single movie details',
+                'description': 'Get single movie details (related movies are cards)',
+                'parameters': FIELDS_PARAMETER_DOC,
                 'example': '/api/movie/115485'
             },
+            'movies_by_genre': {
+                'url': '/api/genre/<name>',
+                'description': 'Get movies of a genre, newest first',
+                'parameters': {
+                    'page': 'Page number',
+                    'per_page': 'Items per page (default: 30, max: 100)',
+                    'cursor': 'Opaque next_cursor from the previous page, replaces page',
+                    **FIELDS_PARAMETER_DOC
+                },
+                'example': '/api/genre/剧情'
+            },
+            'movies_by_person': {
+                'url': '/api/person/<name>',
+                'description': 'Get movies a person directed or appears in, newest first, with their roles',
+                'parameters': {
+                    'role': 'Only credits of this role: director, cast',
+                    'page': 'Page number',
+                    'per_page': 'Items per page (default: 30, max: 100)',
+                    'cursor': 'Opaque next_cursor from the previous page, replaces page',
+                    **FIELDS_PARAMETER_DOC
+                },
+                'example': '/api/person/周星驰?role=director'
+            },
+            'browse': {
+                'url': '/api/browse',
+                'description': 'Browse movies by combined filters, newest first, with genre / country / language / year facet counts of the result',
+                'parameters': {
+                    'type': 'Filter by type: movie, other',
+                    'category': 'Filter by category id (with type)',
+                    'genre': 'Comma-separated genres, all must match',
+                    'country': 'Comma-separated countries, any may match',
+                    'language': 'Comma-separated languages, any may match',
+                    'year_from': 'Earliest release year',
+                    'year_to': 'Latest release year',
+                    'min_imdb': 'Minimum IMDb score',
+                    'min_douban': 'Minimum Douban score',
+                    'has_magnet': 'Only movies with a magnet link (1)',
+                    'page': 'Page number',
+                    'per_page': 'Items per page (default: 30, max: 100)',
+                    **FIELDS_PARAMETER_DOC
+                },
+                'example': '/api/browse?genre=剧情&country=美国,英国&year_from=2010&min_douban=7&has_magnet=1'
+            },
+            'movies_batch': {
+                'url': '/api/movies/batch',
+                'description': f'Get up to {BATCH_MAX_IDS} movies in one request, in request order (null for unknown ids)',
+                'parameters': {
+                    'ids': 'Comma-separated movie ids (GET), or POST a JSON body {"ids": [...]}',
+                    **FIELDS_PARAMETER_DOC
+                },
+                'example': '/api/movies/batch?ids=115485,115486&include=links'
+            },
             'search': {
                 'url': '/api/search',
-                'description': 'Search movies',
+                'description': 'Search movies (full-text ranked for keywords of 3+ characters)',
                 'parameters': {
                     'keyword': 'Search keyword (required)',
                     'type': 'Filter by type: movie, other',
                     'page': 'Page number',
-                    'per_page': 'Results per page'
+                    'per_page': 'Results per page',
+                    'include': FIELDS_PARAMETER_DOC['include'],
+                    'fields': FIELDS_PARAMETER_DOC['fields']
                 }
             },
             'latest': {
@@ -639,16 +1772,32 @@ def home():
                 'description': 'Get latest movies',
                 'parameters': {
                     'type': 'Filter by type: movie, other',
-                    'limit': 'Number of results (max: 100)'
+                    'limit': 'Number of results (max: 100)',
+                    'cursor': 'Opaque next_cursor from the previous call',
+                    'include': FIELDS_PARAMETER_DOC['include'],
+                    'fields': FIELDS_PARAMETER_DOC['fields']
                 }
             },
             'home': {
                 'url': '/api/home',
-                'description': 'Get home page data with multiple sections'
+                'description': 'Get home page data with multiple sections (featured movie is complete)',
+                'parameters': FIELDS_PARAMETER_DOC
             },
             'stats': {
                 'url': '/api/stats',
-                'description': 'Get detailed database statistics'
+                'description': 'Get detailed database statistics, connection pool and response cache counters (never cached)'
+            },
+            'slow_queries': {
+                'url': '/api/admin/slow-queries',
+                'description': 'Statements ranked by time with bound parameters and EXPLAIN QUERY PLAN (local only, needs QUERY_PROFILING=1; DELETE resets)',
+                'parameters': {
+                    'limit': 'Number of statements (default 20)',
+                    'sort': 'Rank by: total, max, mean'
+                }
+            },
+            'metrics': {
+                'url': '/metrics',
+                'description': 'Prometheus text-format request, SQLite, pool and cache metrics'
             }
         }
     })
@@ -676,15 +1825,13 @@ if __name__ == '__main__':
         
         # Show some stats and check table structure
         try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            
-            # Show basic stats
-            cursor.execute('SELECT COUNT(*) as total FROM movies')
-            total = cursor.fetchone()['total']
-            logger.info(f"Database contains {total} movies")
-            
-            conn.close()
+            with get_db_connection() as conn:
+                cursor = conn.cursor()
+                
+                # Show basic stats
+                cursor.execute('SELECT COUNT(*) as total FROM movies')
+                total = cursor.fetchone()['total']
+                logger.info(f"Database contains {total} movies")
         except Exception as e:
             logger.error(f"Error checking database: {e}")
     
@@ -2,30 +2,64 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
 import logging
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import time
-from functools import lru_cache
 from datetime import datetime, timedelta
-import requests
+from functools import partial, wraps
 from bs4 import BeautifulSoup
 import re
-from urllib.parse import urljoin, quote
+from urllib.parse import urljoin, urlparse, quote
+from compression import encode_body, init_compression, negotiate_encoding, set_encoded_body
+from disk_cache import DiskCache, default_cache_path
+from json_provider import FastJSONProvider, pretty_requested
+from upstream import UPSTREAM_TIMEOUT, AsyncUpstream, UpstreamError
+from metrics import init_metrics
 
 app = Flask(__name__)
 CORS(app)
 
-# Configure Flask
-app.config['JSON_AS_ASCII'] = False
-app.config['JSONIFY_PRETTYPRINT_REGULAR'] = True
+# Configure Flask: compact UTF-8 JSON (?pretty=1 for indented output)
+app.json = FastJSONProvider(app)
+
+# Request metrics at /metrics (registered first so latency includes compression)
+metrics = init_metrics(app)
+init_compression(app)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Deadline of each page in the home / latest fan-outs
+FANOUT_DEADLINE_SECONDS = float(os.environ.get('FANOUT_DEADLINE_SECONDS', 10))
+
 # Cache configuration
 CACHE_DURATION_MINUTES = 30
 CACHE_MAX_SIZE = 1000
+CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+# Responses persisted across restarts and shared by server processes ('' keeps them in memory only)
+ONLINE_CACHE_PATH = os.environ.get('ONLINE_CACHE_PATH', default_cache_path())
+
+# Entries expire up to this fraction early, so pages cached together are not all refetched together
+CACHE_TTL_JITTER = float(os.environ.get('CACHE_TTL_JITTER', 0.1))
+
+# Expired responses are still served for this long while a background refresh replaces them;
+# older ones are refetched before responding
+CACHE_MAX_STALE_SECONDS = float(os.environ.get('CACHE_MAX_STALE_SECONDS', 24 * 60 * 60))
+CACHE_REFRESH_WORKERS = int(os.environ.get('CACHE_REFRESH_WORKERS', 2))
+
+# Background prewarming of home, latest and the first pages of every category (opt-in, CACHE_PREWARM=1)
+CACHE_PREWARM = os.environ.get('CACHE_PREWARM', '0').lower() in ('1', 'true', 'yes')
+PREWARM_INTERVAL_SECONDS = float(os.environ.get('PREWARM_INTERVAL_SECONDS', 60))
+PREWARM_LEAD_SECONDS = float(os.environ.get('PREWARM_LEAD_SECONDS', 5 * 60))
+PREWARM_CATEGORY_PAGES = int(os.environ.get('PREWARM_CATEGORY_PAGES', 1))
+PREWARM_CONCURRENCY = int(os.environ.get('PREWARM_CONCURRENCY', 2))
 
 # Base URL
 BASE_URL = "https://www.piaohua.com"
@@ -46,6 +80,23 @@ CATEGORIES = {
     'variety': {'name': '综艺节目', 'path': 'zongyi'},
 }
 
+# Upstream and cache metrics
+upstream_requests = metrics.counter(
+    'upstream_requests_total', 'Pages fetched from the upstream site', ['host', 'status']
+)
+upstream_duration = metrics.histogram(
+    'upstream_request_duration_seconds', 'Upstream page fetch latency', ['host', 'status']
+)
+cache_requests = metrics.counter(
+    'cache_requests_total', 'Response cache lookups', ['cache', 'result']
+)
+cache_evictions = metrics.counter(
+    'cache_evictions_total', 'Response cache entries dropped', ['reason']
+)
+cache_refreshes = metrics.counter(
+    'cache_refreshes_total', 'Background refreshes of stale responses', ['cache', 'result']
+)
+
 # HTTP headers
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -55,25 +106,150 @@ HEADERS = {
     'Connection': 'keep-alive',
 }
 
+class ScrapeError(Exception):
+    """A scrape that fetched pages but found nothing worth serving or caching"""
+
+class SingleFlight:
+    """Runs concurrent calls with the same key once, every caller sharing its result or exception"""
+    
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executed = 0
+        self._shared = 0
+    
+    def do(self, key, fn, *args, **kwargs):
+        future, leader = self.join(key)
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.settle(key, future, error=e)
+            raise
+        self.settle(key, future, result)
+        return result
+    
+    def join(self, key) -> tuple[Future, bool]:
+        """(future, leader) for key, the caller leading a new flight when none is in flight
+        
+        A leader must settle() its flight, the others wait on the future.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self._shared += 1
+                return future, False
+            future = self._calls[key] = Future()
+            self._executed += 1
+            return future, True
+    
+    def settle(self, key, future, result=None, error=None):
+        """Hand a flight's outcome to its waiters and let later calls start a new flight"""
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'executed': self._executed, 'shared': self._shared, 'in_flight': len(self._calls)}
+
+def single_flight(method):
+    """Scraper method whose concurrent calls with the same arguments (the same upstream URL) share one fetch and parse"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self.inflight.do(key, method, self, *args, **kwargs)
+    return wrapper
+
+def record_upstream_fetch(url: str, status, elapsed: float):
+    """Account one upstream fetch (network time only, parsing is accounted to the request)"""
+    host = urlparse(url).netloc
+    upstream_requests.inc(host=host, status=status)
+    upstream_duration.observe(elapsed, host=host, status=status)
+
 class PiaohuaScraper:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(HEADERS)
+        # Pooled keep-alive client on its own event loop, shared by every request
+        self.upstream = AsyncUpstream(HEADERS, on_fetch=record_upstream_fetch)
+        self.inflight = SingleFlight()
     
-    def get_soup(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch page and return BeautifulSoup object"""
+    def get_soup(self, url: str) -> BeautifulSoup:
+        """Fetch page and return BeautifulSoup object, raising UpstreamError if the fetch fails"""
         try:
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = 'utf-8'
-            return BeautifulSoup(response.text, 'html.parser')
-        except Exception as e:
+            html = self.upstream.get(url)
+        except UpstreamError as e:
             logger.error(f"Error fetching {url}: {str(e)}")
-            return None
+            raise
+        return BeautifulSoup(html, 'html.parser')
+    
+    def parse_pages(self, pages: List[tuple], deadline: Optional[float] = None) -> List[Any]:
+        """Parse several pages fetched concurrently on the upstream loop, pages being (url, parse) pairs
+        
+        Each page is single-flighted on its own, so overlapping fan-outs and
+        single-page calls share the fetch and parse of every page they have
+        in common. A page that failed or missed the deadline (waiting on
+        another caller's flight included) is its UpstreamError in the result.
+        """
+        started = time.monotonic()
+        deadline = deadline or UPSTREAM_TIMEOUT
+        flights = [(url, parse) + self.inflight.join(('page', url)) for url, parse in pages]
+        led = [(url, parse, future) for url, parse, future, leader in flights if leader]
+        
+        if led:
+            bodies = self.upstream.get_many([url for url, _, _ in led], deadline)
+            for (url, parse, future), html in zip(led, bodies):
+                if isinstance(html, UpstreamError):
+                    logger.error(f"Error fetching {url}: {str(html)}")
+                    self.inflight.settle(('page', url), future, error=html)
+                    continue
+                try:
+                    result = parse(BeautifulSoup(html, 'html.parser'))
+                except Exception as e:
+                    self.inflight.settle(('page', url), future, error=e)
+                    continue
+                self.inflight.settle(('page', url), future, result)
+        
+        results = []
+        for url, _, future, _ in flights:
+            try:
+                results.append(future.result(max(deadline - (time.monotonic() - started), 0)))
+            except FutureTimeoutError:
+                results.append(UpstreamError(f"{url}: exceeded the {deadline}s deadline"))
+            except UpstreamError as e:
+                results.append(e)
+        return results
+    
+    def parse_home_and_categories(self, category_paths: tuple,
+                                  deadline: Optional[float] = None) -> tuple[List[Dict], List[tuple]]:
+        """Home page movies and the first page of each category, fetched concurrently
+        
+        A page that failed or missed the deadline parses as empty.
+        """
+        pages = [(BASE_URL, self.parse_home_soup)]
+        pages += [(self.category_url(path, 1), self.parse_category_soup) for path in category_paths]
+        results = self.parse_pages(pages, deadline)
+        results = [parse(None) if isinstance(result, Exception) else result
+                   for (_, parse), result in zip(pages, results)]
+        return results[0], results[1:]
     
-    def parse_home_page(self) -> List[Dict]:
-        """Parse home page movies from ul-imgtxt1"""
-        soup = self.get_soup(BASE_URL)
+    def parse_category_pages(self, category_paths: tuple, page: int = 1,
+                             deadline: Optional[float] = None) -> List[tuple]:
+        """(movies, total pages) of the same page of several categories, fetched concurrently
+        
+        A page that failed or missed the deadline parses as empty.
+        """
+        pages = [(self.category_url(path, page), self.parse_category_soup) for path in category_paths]
+        return [self.parse_category_soup(None) if isinstance(result, Exception) else result
+                for result in self.parse_pages(pages, deadline)]
+    
+    def parse_home_soup(self, soup: Optional[BeautifulSoup]) -> List[Dict]:
+        """Home page movies from a fetched home page"""
         if not soup:
             return []
         
@@ -110,14 +286,21 @@ class PiaohuaScraper:
         
         return movies
     
-    def parse_category_page(self, category_path: str, page: int = 1) -> tuple[List[Dict], int]:
-        """Parse category page movies from ul-imgtxt2"""
+    def category_url(self, category_path: str, page: int = 1) -> str:
+        """URL of a category listing page"""
         if page == 1:
-            url = f"{BASE_URL}/html/{category_path}/index.html"
-        else:
-            url = f"{BASE_URL}/html/{category_path}/list_{page}.html"
-        
-        soup = self.get_soup(url)
+            return f"{BASE_URL}/html/{category_path}/index.html"
+        return f"{BASE_URL}/html/{category_path}/list_{page}.html"
+    
+    def parse_category_page(self, category_path: str, page: int = 1) -> tuple[List[Dict], int]:
+        """Parse category page movies from ul-imgtxt2, raising UpstreamError if the fetch fails"""
+        result, = self.parse_pages([(self.category_url(category_path, page), self.parse_category_soup)])
+        if isinstance(result, Exception):
+            raise result
+        return result
+    
+    def parse_category_soup(self, soup: Optional[BeautifulSoup]) -> tuple[List[Dict], int]:
+        """(movies, total pages) from a fetched category page"""
         if not soup:
             return [], 0
         
@@ -165,6 +348,7 @@ class PiaohuaScraper:
         
         return movies, total_pages
     
+    @single_flight
     def parse_search_results(self, keyword: str, page: int = 1) -> tuple[List[Dict], int]:
         """Parse search results"""
         params = {
@@ -190,9 +374,6 @@ class PiaohuaScraper:
         else:
             soup = self.get_soup(url)
         
-        if not soup:
-            return [], 0
-        
         movies = []
         movie_list = soup.find('ul', class_='ul-imgtxt2')
         if not movie_list:
@@ -237,11 +418,10 @@ class PiaohuaScraper:
         
         return movies, total_pages
     
+    @single_flight
     def parse_movie_detail(self, movie_url: str) -> Dict:
         """Parse movie detail page"""
         soup = self.get_soup(movie_url)
-        if not soup:
-            return {}
         
         detail = {
             'id': self.extract_movie_id(movie_url),
@@ -484,25 +664,256 @@ class PiaohuaScraper:
 
 # Initialize scraper
 scraper = PiaohuaScraper()
+metrics.expose_stats('upstream_single_flight', 'Scraper calls', scraper.inflight.stats,
+                     counters=['executed', 'shared'], gauges=['in_flight'])
+metrics.expose_stats('upstream_client', 'Upstream client', scraper.upstream.stats,
+                     counters=['fetches'], gauges=['in_flight'])
+
+class TTLCache:
+    """Thread-safe LRU of responses by (type, key), each entry expiring after its own jittered TTL
+    
+    Bounded by entry count and by the approximate size of the cached JSON
+    plus the encoded bodies served from each entry (see body()).
+    Expired entries are kept max_stale seconds longer, for serving stale
+    while they are refreshed. With a DiskCache store, entries are written
+    through to disk and memory misses are read back from it, so they
+    outlive the process.
+    """
+    
+    def __init__(self, max_entries: int = CACHE_MAX_SIZE, max_bytes: int = CACHE_MAX_BYTES,
+                 ttl: float = CACHE_DURATION_MINUTES * 60, jitter: float = CACHE_TTL_JITTER,
+                 max_stale: float = CACHE_MAX_STALE_SECONDS, store: Optional[DiskCache] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.jitter = jitter
+        self.max_stale = max_stale
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+    
+    def _drop(self, key):
+        """Remove an entry (caller holds the lock)"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry['size']
+    
+    def _put(self, key, entry: Dict):
+        """Insert an entry and evict down to the bounds (caller holds the lock)"""
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._bytes += entry['size']
+        self._evict()
+    
+    def _evict(self):
+        """Drop least recently used entries down to the bounds (caller holds the lock)"""
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self._evictions += 1
+            cache_evictions.inc(reason='size')
+    
+    def get(self, key) -> Optional[Dict]:
+        """Entry ({'data', 'expires_at', ...}) for key, possibly expired but within max_stale, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] + self.max_stale <= time.time():
+                self._drop(key)
+                self._expirations += 1
+                cache_evictions.inc(reason='expired')
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+        
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            if entry['size'] <= self.max_bytes:
+                self._put(key, entry)
+            return entry
+    
+    def expires_at(self, key) -> Optional[float]:
+        """Expiry of the entry for key in memory or on disk, without counting a lookup, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                return entry['expires_at']
+        if self.store is None:
+            return None
+        row = self.store.get(key)
+        return row[1] if row is not None else None
+    
+    def _load(self, key) -> Optional[Dict]:
+        """Entry for key from the disk store (written by this or an earlier process), or None"""
+        if self.store is None:
+            return None
+        row = self.store.get(key)
+        if row is None or row[1] + self.max_stale <= time.time():
+            return None
+        text, expires_at = row
+        return {'data': json.loads(text), 'expires_at': expires_at, 'size': len(text), 'bodies': {}}
+    
+    def expiry(self, ttl: Optional[float] = None) -> float:
+        """Expiry timestamp of an entry stored now for ttl seconds (default: the cache TTL), minus jitter"""
+        ttl = self.ttl if ttl is None else ttl
+        return time.time() + ttl * (1 - random.uniform(0, self.jitter))
+    
+    def set(self, key, data: Dict, expires_at: Optional[float] = None):
+        """Store data until expires_at (default: one jittered TTL from now)"""
+        expires_at = self.expiry() if expires_at is None else expires_at
+        text = app.json.dumps(data)
+        size = len(text)
+        if size <= self.max_bytes:
+            with self._lock:
+                self._put(key, {'data': data, 'expires_at': expires_at, 'size': size, 'bodies': {}})
+        if self.store is not None:
+            self.store.set(key, text, expires_at)
+    
+    def body(self, key, entry: Dict, variant, build) -> tuple:
+        """(body, encoding) of an entry for a variant, built once by build() and kept on the entry"""
+        encoded = entry['bodies'].get(variant)
+        if encoded is not None:
+            return encoded
+        encoded = build()
+        with self._lock:
+            if variant not in entry['bodies']:
+                entry['bodies'][variant] = encoded
+                # Only an entry still cached counts towards the bounds
+                if self._entries.get(key) is entry:
+                    entry['size'] += len(encoded[0])
+                    self._bytes += len(encoded[0])
+                    self._evict()
+        return encoded
+    
+    def stats(self) -> Dict:
+        """Cache counters for the stats endpoint"""
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            stats = {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'disk_hits': self._disk_hits,
+                'misses': self._misses,
+                'hit_ratio': round((self._hits + self._disk_hits) / lookups, 4) if lookups else 0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+        stats['disk'] = self.store.stats() if self.store is not None else None
+        return stats
+
+def open_disk_cache() -> Optional[DiskCache]:
+    """The persistent response store, or None to cache in memory only"""
+    if not ONLINE_CACHE_PATH:
+        return None
+    try:
+        return DiskCache(ONLINE_CACHE_PATH, keep_expired=CACHE_MAX_STALE_SECONDS)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"Persistent cache unavailable at {ONLINE_CACHE_PATH}, caching in memory only: {e}")
+        return None
+
+response_cache = TTLCache(store=open_disk_cache())
+metrics.expose_stats('online_cache', 'Response cache', response_cache.stats, gauges=['entries', 'bytes'])
+
+def cache_fields(response_data: Dict) -> Dict:
+    """The part of a response carrying its cached / cache_expires flags"""
+    return response_data if 'cached' in response_data else response_data['data']
+
+# Background revalidation of stale responses, at most one refresh per (type, key) at a time
+refresh_executor = ThreadPoolExecutor(max_workers=CACHE_REFRESH_WORKERS, thread_name_prefix='cache-refresh')
+refreshing = set()
+refreshing_lock = threading.Lock()
+
+def claim_refresh(cache_type: str, key: str) -> bool:
+    """Reserve the refresh of (type, key), False if one is already pending"""
+    with refreshing_lock:
+        if (cache_type, key) in refreshing:
+            return False
+        refreshing.add((cache_type, key))
+        return True
+
+def refresh_cached_data(cache_type: str, key: str, build) -> bool:
+    """Rebuild a claimed response and cache it, releasing the claim; False if the rebuild failed
+    
+    Builders raise when upstream fails or yields nothing, the entry being
+    refreshed then stays as it was: a failed scrape is never cached.
+    """
+    try:
+        response_data = build()
+        if response_data is None:
+            raise ScrapeError('nothing found')
+        set_cached_data(cache_type, key, response_data)
+        cache_refreshes.inc(cache=cache_type, result='success')
+        return True
+    except Exception as e:
+        logger.error(f"Error refreshing cached {cache_type} {key}: {str(e)}")
+        cache_refreshes.inc(cache=cache_type, result='error')
+        return False
+    finally:
+        with refreshing_lock:
+            refreshing.discard((cache_type, key))
+
+def schedule_refresh(cache_type: str, key: str, build):
+    """Queue a background refresh of (type, key) unless one is already pending"""
+    if claim_refresh(cache_type, key):
+        refresh_executor.submit(refresh_cached_data, cache_type, key, build)
 
-# Cache functions
-@lru_cache(maxsize=CACHE_MAX_SIZE)
-def get_cached_data(cache_type: str, key: str, cache_time: str) -> Optional[Dict]:
-    """Generic cache getter"""
-    return None
-
-def set_cached_data(cache_type: str, key: str, data: Dict, cache_time: str):
-    """Generic cache setter"""
-    get_cached_data.cache_clear()
-    get_cached_data(cache_type, key, cache_time)
-    get_cached_data.__wrapped__.__defaults__ = (data,)
-
-def get_cache_key() -> str:
-    """Generate cache key based on time window"""
-    now = datetime.now()
-    minutes = (now.minute // CACHE_DURATION_MINUTES) * CACHE_DURATION_MINUTES
-    cache_time = now.replace(minute=minutes, second=0, microsecond=0)
-    return cache_time.strftime("%Y%m%d%H%M")
+def flag_cached(response_data: Dict, stale: bool) -> Dict:
+    """Copy of a cached response flagged cached: true (and stale: true), the entry itself is shared"""
+    response_data = dict(response_data)
+    if 'cached' not in response_data:
+        response_data['data'] = dict(response_data['data'])
+    fields = cache_fields(response_data)
+    fields['cached'] = True
+    if stale:
+        fields['stale'] = True
+    return response_data
+
+def get_cached_response(cache_type: str, key: str, refresh=None):
+    """Cached response for (type, key), flagged cached: true, or None
+    
+    An expired response is still returned (flagged stale: true) until it is
+    CACHE_MAX_STALE_SECONDS past its expiry, and refresh(), which rebuilds
+    the response, is scheduled in the background to replace it. The flagged
+    body is serialized and compressed once per content encoding and kept on
+    the cache entry, so a hit only sends stored bytes.
+    """
+    entry = response_cache.get((cache_type, key))
+    stale = entry is not None and entry['expires_at'] <= time.time()
+    cache_requests.inc(cache=cache_type, result='miss' if entry is None else 'stale' if stale else 'hit')
+    if entry is None:
+        return None
+    if stale and refresh is not None:
+        schedule_refresh(cache_type, key, refresh)
+    
+    if pretty_requested():
+        return jsonify(flag_cached(entry['data'], stale))
+    
+    encoding = negotiate_encoding()
+    body, applied = response_cache.body(
+        (cache_type, key), entry, (stale, encoding),
+        lambda: encode_body(app.json.dumps_bytes(flag_cached(entry['data'], stale)) + b'\n', encoding)
+    )
+    response = app.response_class(mimetype=app.json.mimetype)
+    return set_encoded_body(response, body, applied)
+
+def set_cached_data(cache_type: str, key: str, data: Dict, ttl: Optional[float] = None):
+    """Cache a response for (type, key), recording its actual expiry in cache_expires"""
+    expires_at = response_cache.expiry(ttl)
+    cache_fields(data)['cache_expires'] = datetime.fromtimestamp(expires_at).isoformat()
+    response_cache.set((cache_type, key), data, expires_at)
 
 def format_movie_response(movie: Dict, category: str = None) -> Dict:
     """Format movie data for API response"""
@@ -529,6 +940,10 @@ def format_movie_response(movie: Dict, category: str = None) -> Dict:
         'magnet_links': movie.get('magnet_links', [])
     }
 
+def category_type_of(category: str) -> str:
+    """'other' for series / anime / variety, 'movie' for the rest"""
+    return 'other' if category in ['series', 'anime', 'variety'] else 'movie'
+
 @app.route('/api/categories', methods=['GET'])
 def get_categories():
     """Get all categories"""
@@ -545,7 +960,7 @@ def get_categories():
             'count': 0  # Real-time, no pre-counted data
         }
         
-        if cat_id in ['series', 'anime', 'variety']:
+        if category_type_of(cat_id) == 'other':
             categories['other'].append(cat_data)
         else:
             categories['movies'].append(cat_data)
@@ -555,6 +970,45 @@ def get_categories():
         'data': categories
     })
 
+def build_category_response(category_type: str, category: str, page: int, per_page: int) -> Dict:
+    """Scrape one category page into an API response"""
+    cat_info = CATEGORIES[category]
+    logger.info(f"Fetching {category} page {page} from web...")
+    
+    # Fetch movies
+    try:
+        movies, total_pages = scraper.parse_category_page(cat_info['path'], page)
+    except UpstreamError as e:
+        # Past the last page the site answers 404, an empty page rather than a failure
+        if page == 1 or e.status != 404:
+            raise
+        movies, total_pages = [], 0
+    if page == 1 and not movies:
+        raise ScrapeError(f"No movies found on the first page of {category}")
+    
+    # Format response
+    formatted_movies = [format_movie_response(movie, category) for movie in movies]
+    
+    return {
+        'status': 'success',
+        'data': {
+            'category_type': category_type,
+            'category': category,
+            'category_name': cat_info['name'],
+            'movies': formatted_movies[:per_page],
+            'pagination': {
+                'current_page': page,
+                'total_pages': total_pages,
+                'total_movies': len(formatted_movies),
+                'per_page': per_page,
+                'has_next': page < total_pages,
+                'has_prev': page > 1
+            },
+            'cached': False,
+            'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
+        }
+    }
+
 @app.route('/api/movies/<category_type>/<category>', methods=['GET'])
 def get_movies_by_category(category_type, category):
     """Get movies by category"""
@@ -564,52 +1018,26 @@ def get_movies_by_category(category_type, category):
     # Validate
     per_page = min(max(per_page, 1), 30)
     
+    # Get category info
+    if category not in CATEGORIES:
+        return jsonify({
+            'status': 'error',
+            'message': f'Unknown category: {category}'
+        }), 404
+    
     # Check cache
-    cache_key = get_cache_key()
-    cache_data = get_cached_data('category', f"{category}_{page}", cache_key)
-    if cache_data:
+    cache_key = f"{category}_{page}_{per_page}"
+    build = partial(build_category_response, category_type, category, page, per_page)
+    cached = get_cached_response('category', cache_key, refresh=build)
+    if cached is not None:
         logger.info(f"Returning cached data for {category} page {page}")
-        return jsonify(cache_data)
+        return cached
     
     try:
-        # Get category info
-        if category not in CATEGORIES:
-            return jsonify({
-                'status': 'error',
-                'message': f'Unknown category: {category}'
-            }), 404
-        
-        cat_info = CATEGORIES[category]
-        logger.info(f"Fetching {category} page {page} from web...")
-        
-        # Fetch movies
-        movies, total_pages = scraper.parse_category_page(cat_info['path'], page)
-        
-        # Format response
-        formatted_movies = [format_movie_response(movie, category) for movie in movies]
-        
-        response_data = {
-            'status': 'success',
-            'data': {
-                'category_type': category_type,
-                'category': category,
-                'category_name': cat_info['name'],
-                'movies': formatted_movies[:per_page],
-                'pagination': {
-                    'current_page': page,
-                    'total_pages': total_pages,
-                    'total_movies': len(formatted_movies),
-                    'per_page': per_page,
-                    'has_next': page < total_pages,
-                    'has_prev': page > 1
-                },
-                'cached': False,
-                'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
-            }
-        }
+        response_data = build()
         
         # Cache the response
-        set_cached_data('category', f"{category}_{page}", response_data, cache_key)
+        set_cached_data('category', cache_key, response_data)
         
         return jsonify(response_data)
         
@@ -620,19 +1048,37 @@ def get_movies_by_category(category_type, category):
             'message': 'Failed to fetch movies'
         }), 500
 
+def build_movie_response(movie_id: str, movie_url: str) -> Optional[Dict]:
+    """Scrape a movie detail page into an API response, None if it has no movie"""
+    logger.info(f"Fetching movie {movie_id} detail from {movie_url}")
+    
+    # Fetch movie detail
+    movie_detail = scraper.parse_movie_detail(movie_url)
+    
+    if not movie_detail or not movie_detail.get('title'):
+        return None
+    
+    return {
+        'status': 'success',
+        'data': format_movie_response(movie_detail),
+        'cached': False,
+        'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
+    }
+
 @app.route('/api/movie/<movie_id>', methods=['GET'])
 def get_movie_detail(movie_id):
     """Get movie detail"""
+    # Get movie URL from request
+    movie_url = request.args.get('url')
+    build = partial(build_movie_response, movie_id, movie_url) if movie_url else None
+    
     # Check cache
-    cache_key = get_cache_key()
-    cache_data = get_cached_data('movie', movie_id, cache_key)
-    if cache_data:
+    cached = get_cached_response('movie', movie_id, refresh=build)
+    if cached is not None:
         logger.info(f"Returning cached data for movie {movie_id}")
-        return jsonify(cache_data)
+        return cached
     
     try:
-        # Get movie URL from request
-        movie_url = request.args.get('url')
         if not movie_url:
             # Try to construct URL (this might not work without proper category)
             return jsonify({
@@ -640,39 +1086,80 @@ def get_movie_detail(movie_id):
                 'message': 'Movie URL is required'
             }), 400
         
-        logger.info(f"Fetching movie {movie_id} detail from {movie_url}")
-        
-        # Fetch movie detail
-        movie_detail = scraper.parse_movie_detail(movie_url)
+        response_data = build()
         
-        if not movie_detail or not movie_detail.get('title'):
+        if response_data is None:
             return jsonify({
                 'status': 'error',
                 'message': 'Movie not found'
             }), 404
         
-        # Format response
-        formatted_movie = format_movie_response(movie_detail)
-        
-        response_data = {
-            'status': 'success',
-            'data': formatted_movie,
-            'cached': False,
-            'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
-        }
-        
         # Cache the response
-        set_cached_data('movie', movie_id, response_data, cache_key)
+        set_cached_data('movie', movie_id, response_data)
         
         return jsonify(response_data)
         
     except Exception as e:
+        if isinstance(e, UpstreamError) and e.status == 404:
+            return jsonify({
+                'status': 'error',
+                'message': 'Movie not found'
+            }), 404
         logger.error(f"Error fetching movie {movie_id}: {str(e)}")
         return jsonify({
             'status': 'error',
             'message': 'Failed to fetch movie details'
         }), 500
 
+def build_search_response(keyword: str, page: int, per_page: int) -> Dict:
+    """Scrape one page of search results into an API response"""
+    logger.info(f"Searching for '{keyword}' page {page}")
+    
+    # Search movies
+    try:
+        movies, total_pages = scraper.parse_search_results(keyword, page)
+    except UpstreamError as e:
+        # Past the last page the site answers 404, handled like an empty page below
+        if page == 1 or e.status != 404:
+            raise
+        movies, total_pages = [], 0
+    
+    # Format response
+    formatted_movies = [format_movie_response(movie) for movie in movies]
+    
+    # Handle edge case: if no movies found and page > 1, adjust total_pages
+    if not movies and page > 1:
+        # Try to get first page to determine actual total pages
+        first_page_movies, actual_total_pages = scraper.parse_search_results(keyword, 1)
+        if not first_page_movies:
+            # No results at all, set total_pages to 1
+            total_pages = 1
+            page = 1  # Reset to page 1
+        else:
+            total_pages = actual_total_pages
+    
+    # Ensure current_page doesn't exceed total_pages
+    if page > total_pages and total_pages > 0:
+        page = total_pages
+    
+    return {
+        'status': 'success',
+        'data': {
+            'keyword': keyword,
+            'movies': formatted_movies[:per_page],
+            'pagination': {
+                'current_page': page,
+                'total_pages': total_pages,
+                'total_movies': len(formatted_movies),
+                'per_page': per_page,
+                'has_next': page < total_pages,
+                'has_prev': page > 1
+            },
+            'cached': False,
+            'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
+        }
+    }
+
 @app.route('/api/search', methods=['GET'])
 def search_movies():
     """Search movies"""
@@ -687,56 +1174,18 @@ def search_movies():
         }), 400
     
     # Check cache
-    cache_key = get_cache_key()
-    cache_data = get_cached_data('search', f"{keyword}_{page}", cache_key)
-    if cache_data:
+    cache_key = f"{keyword}_{page}_{per_page}"
+    build = partial(build_search_response, keyword, page, per_page)
+    cached = get_cached_response('search', cache_key, refresh=build)
+    if cached is not None:
         logger.info(f"Returning cached search results for '{keyword}' page {page}")
-        return jsonify(cache_data)
+        return cached
     
     try:
-        logger.info(f"Searching for '{keyword}' page {page}")
-        
-        # Search movies
-        movies, total_pages = scraper.parse_search_results(keyword, page)
-        
-        # Format response
-        formatted_movies = [format_movie_response(movie) for movie in movies]
-        
-        # Handle edge case: if no movies found and page > 1, adjust total_pages
-        if not movies and page > 1:
-            # Try to get first page to determine actual total pages
-            first_page_movies, actual_total_pages = scraper.parse_search_results(keyword, 1)
-            if not first_page_movies:
-                # No results at all, set total_pages to 1
-                total_pages = 1
-                page = 1  # Reset to page 1
-            else:
-                total_pages = actual_total_pages
-        
-        # Ensure current_page doesn't exceed total_pages
-        if page > total_pages and total_pages > 0:
-            page = total_pages
-        
-        response_data = {
-            'status': 'success',
-            'data': {
-                'keyword': keyword,
-                'movies': formatted_movies[:per_page],
-                'pagination': {
-                    'current_page': page,
-                    'total_pages': total_pages,
-                    'total_movies': len(formatted_movies),
-                    'per_page': per_page,
-                    'has_next': page < total_pages,
-                    'has_prev': page > 1
-                },
-                'cached': False,
-                'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
-            }
-        }
+        response_data = build()
         
         # Cache the response
-        set_cached_data('search', f"{keyword}_{page}", response_data, cache_key)
+        set_cached_data('search', cache_key, response_data)
         
         return jsonify(response_data)
         
@@ -747,6 +1196,38 @@ def search_movies():
             'message': 'Failed to search movies'
         }), 500
 
+def build_latest_response(limit: int) -> Dict:
+    """Scrape the newest movies of the popular categories into an API response"""
+    all_movies = []
+    
+    # Fetch first page from popular categories
+    popular_categories = ['action', 'comedy', 'scifi', 'drama']
+    
+    # Fetched concurrently on the upstream loop, a slow category is dropped at its deadline
+    categories = popular_categories[:3]
+    paths = tuple(CATEGORIES[category]['path'] for category in categories)
+    pages = scraper.parse_category_pages(paths, 1, deadline=FANOUT_DEADLINE_SECONDS)
+    
+    for category, (movies, _) in zip(categories, pages):
+        for movie in movies[:4]:  # Take first 4 from each category
+            formatted = format_movie_response(movie, category)
+            all_movies.append(formatted)
+    if not all_movies:
+        raise ScrapeError("No latest movies found in any category")
+    
+    # Sort by date (newest first)
+    all_movies.sort(key=lambda x: x.get('date', ''), reverse=True)
+    
+    return {
+        'status': 'success',
+        'data': {
+            'movies': all_movies[:limit],
+            'total': len(all_movies),
+            'cached': False,
+            'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
+        }
+    }
+
 @app.route('/api/latest', methods=['GET'])
 def get_latest_movies():
     """Get latest movies"""
@@ -754,50 +1235,17 @@ def get_latest_movies():
     limit = min(max(limit, 1), 30)
     
     # Check cache
-    cache_key = get_cache_key()
-    cache_data = get_cached_data('latest', 'all', cache_key)
-    if cache_data:
+    build = partial(build_latest_response, limit)
+    cached = get_cached_response('latest', str(limit), refresh=build)
+    if cached is not None:
         logger.info("Returning cached latest movies")
-        return jsonify(cache_data)
+        return cached
     
     try:
-        all_movies = []
-        
-        # Fetch first page from popular categories
-        popular_categories = ['action', 'comedy', 'scifi', 'drama']
-        
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            
-            for category in popular_categories[:3]:
-                cat_info = CATEGORIES[category]
-                future = executor.submit(scraper.parse_category_page, cat_info['path'], 1)
-                futures.append((category, future))
-            
-            for category, future in futures:
-                try:
-                    movies, _ = future.result()
-                    for movie in movies[:4]:  # Take first 4 from each category
-                        formatted = format_movie_response(movie, category)
-                        all_movies.append(formatted)
-                except Exception as e:
-                    logger.error(f"Error fetching latest from {category}: {str(e)}")
-        
-        # Sort by date (newest first)
-        all_movies.sort(key=lambda x: x.get('date', ''), reverse=True)
-        
-        response_data = {
-            'status': 'success',
-            'data': {
-                'movies': all_movies[:limit],
-                'total': len(all_movies),
-                'cached': False,
-                'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
-            }
-        }
+        response_data = build()
         
         # Cache the response
-        set_cached_data('latest', 'all', response_data, cache_key)
+        set_cached_data('latest', str(limit), response_data)
         
         return jsonify(response_data)
         
@@ -808,88 +1256,84 @@ def get_latest_movies():
             'message': 'Failed to fetch latest movies'
         }), 500
 
+def build_home_response() -> Dict:
+    """Scrape the home page and the featured categories into an API response"""
+    logger.info("Fetching home page data...")
+    
+    # Fetch movies from different categories
+    categories_to_fetch = [
+        ('action', '动作片 Action Movies'),
+        ('comedy', '喜剧片 Comedy Movies'),
+        ('scifi', '科幻片 Sci-Fi Movies'),
+        ('drama', '剧情片 Drama Movies'),
+        ('horror', '恐怖片 Horror Movies'),
+        ('romance', '爱情片 Romance Movies')
+    ]
+    categories_to_fetch = [(cat_id, title) for cat_id, title in categories_to_fetch if cat_id in CATEGORIES]
+    
+    # Home page and categories are fetched concurrently, each within its own deadline
+    home_movies, category_pages = scraper.parse_home_and_categories(
+        tuple(CATEGORIES[cat_id]['path'] for cat_id, _ in categories_to_fetch),
+        deadline=FANOUT_DEADLINE_SECONDS
+    )
+    
+    # Format movies
+    formatted_home_movies = [format_movie_response(movie) for movie in home_movies]
+    
+    # Pick featured movie
+    featured = formatted_home_movies[0] if formatted_home_movies else None
+    
+    # Create sections
+    sections = []
+    
+    # Add latest updates section from home page
+    if formatted_home_movies:
+        sections.append({
+            'title': '最新更新 Latest Updates',
+            'type': 'movie',
+            'movies': formatted_home_movies[:20]  # Increased from 12 to 20
+        })
+    
+    for (cat_id, title), (movies, _) in zip(categories_to_fetch, category_pages):
+        if movies:
+            formatted_movies = [format_movie_response(movie, cat_id) for movie in movies[:15]]
+            if formatted_movies:
+                sections.append({
+                    'title': title,
+                    'type': 'movie',
+                    'category': cat_id,
+                    'movies': formatted_movies
+                })
+    if not sections:
+        raise ScrapeError("No movies found on the home page or any category")
+    
+    return {
+        'status': 'success',
+        'data': {
+            'featured_movie': featured,
+            'sections': sections,
+            'statistics': {
+                'note': 'Statistics not available in online mode'
+            },
+            'cached': False,
+            'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
+        }
+    }
+
 @app.route('/api/home', methods=['GET'])
 def get_home_data():
     """Get home page data"""
     # Check cache
-    cache_key = get_cache_key()
-    cache_data = get_cached_data('home', 'all', cache_key)
-    if cache_data:
+    cached = get_cached_response('home', 'all', refresh=build_home_response)
+    if cached is not None:
         logger.info("Returning cached home data")
-        return jsonify(cache_data)
+        return cached
     
     try:
-        logger.info("Fetching home page data...")
-        
-        # Get home page movies
-        home_movies = scraper.parse_home_page()
-        
-        # Format movies
-        formatted_home_movies = [format_movie_response(movie) for movie in home_movies]
-        
-        # Pick featured movie
-        featured = formatted_home_movies[0] if formatted_home_movies else None
-        
-        # Create sections
-        sections = []
-        
-        # Add latest updates section from home page
-        if formatted_home_movies:
-            sections.append({
-                'title': '最新更新 Latest Updates',
-                'type': 'movie',
-                'movies': formatted_home_movies[:20]  # Increased from 12 to 20
-            })
-        
-        # Fetch movies from different categories
-        categories_to_fetch = [
-            ('action', '动作片 Action Movies'),
-            ('comedy', '喜剧片 Comedy Movies'),
-            ('scifi', '科幻片 Sci-Fi Movies'),
-            ('drama', '剧情片 Drama Movies'),
-            ('horror', '恐怖片 Horror Movies'),
-            ('romance', '爱情片 Romance Movies')
-        ]
-        
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            
-            for cat_id, title in categories_to_fetch:
-                cat_info = CATEGORIES.get(cat_id)
-                if cat_info:
-                    future = executor.submit(scraper.parse_category_page, cat_info['path'], 1)
-                    futures.append((cat_id, title, future))
-            
-            for cat_id, title, future in futures:
-                try:
-                    movies, _ = future.result(timeout=10)
-                    if movies:
-                        formatted_movies = [format_movie_response(movie, cat_id) for movie in movies[:15]]
-                        if formatted_movies:
-                            sections.append({
-                                'title': title,
-                                'type': 'movie',
-                                'category': cat_id,
-                                'movies': formatted_movies
-                            })
-                except Exception as e:
-                    logger.error(f"Error fetching category {cat_id}: {str(e)}")
-        
-        response_data = {
-            'status': 'success',
-            'data': {
-                'featured_movie': featured,
-                'sections': sections,
-                'statistics': {
-                    'note': 'Statistics not available in online mode'
-                },
-                'cached': False,
-                'cache_expires': (datetime.now() + timedelta(minutes=CACHE_DURATION_MINUTES)).isoformat()
-            }
-        }
+        response_data = build_home_response()
         
         # Cache the response
-        set_cached_data('home', 'all', response_data, cache_key)
+        set_cached_data('home', 'all', response_data)
         
         return jsonify(response_data)
         
@@ -900,6 +1344,105 @@ def get_home_data():
             'message': 'Failed to fetch home data'
         }), 500
 
+class CachePrewarmer:
+    """Background thread refreshing home, latest and the first category pages before they expire"""
+    
+    def __init__(self, interval: float = PREWARM_INTERVAL_SECONDS, lead: float = PREWARM_LEAD_SECONDS,
+                 category_pages: int = PREWARM_CATEGORY_PAGES, concurrency: int = PREWARM_CONCURRENCY):
+        self.interval = interval
+        self.lead = lead
+        self.category_pages = category_pages
+        self.concurrency = concurrency
+        self._status = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._cycles = 0
+    
+    def targets(self) -> List[tuple]:
+        """(cache type, key, build) of every prewarmed response, with the endpoints' default parameters"""
+        targets = [
+            ('home', 'all', build_home_response),
+            ('latest', '12', partial(build_latest_response, 12))
+        ]
+        for category in CATEGORIES:
+            for page in range(1, self.category_pages + 1):
+                targets.append((
+                    'category', f"{category}_{page}_14",
+                    partial(build_category_response, category_type_of(category), category, page, 14)
+                ))
+        return targets
+    
+    def due(self, cache_type: str, key: str) -> bool:
+        """True when a response is missing or expires within the lead time"""
+        expires_at = response_cache.expires_at((cache_type, key))
+        return expires_at is None or expires_at - time.time() <= self.lead
+    
+    def refresh(self, target: tuple):
+        """Rebuild one response and record how it went
+        
+        A rebuild that fails or finds nothing is recorded as not ok and leaves
+        the cached response as it was, the next cycle retries it while due.
+        """
+        cache_type, key, build = target
+        if not claim_refresh(cache_type, key):
+            return  # a stale-while-revalidate refresh is already on it
+        started = time.perf_counter()
+        ok = refresh_cached_data(cache_type, key, build)
+        with self._lock:
+            self._status[f"{cache_type}:{key}"] = {
+                'last_refresh': datetime.now().isoformat(),
+                'ok': ok,
+                'duration_ms': round((time.perf_counter() - started) * 1000, 1)
+            }
+    
+    def run_once(self):
+        """Refresh every due response, at most `concurrency` at a time"""
+        due = [target for target in self.targets() if self.due(target[0], target[1])]
+        if due:
+            logger.info(f"Prewarming {len(due)} cached responses")
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='cache-prewarm') as executor:
+                list(executor.map(self.refresh, due))
+        with self._lock:
+            self._cycles += 1
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"Error prewarming cache: {str(e)}")
+            self._stop.wait(self.interval)
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='cache-prewarmer', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def stats(self) -> Dict:
+        """Cycle count and last refresh of each prewarmed response"""
+        with self._lock:
+            return {
+                'running': self._thread is not None and self._thread.is_alive(),
+                'interval_seconds': self.interval,
+                'lead_seconds': self.lead,
+                'cycles': self._cycles,
+                'failures': sum(1 for status in self._status.values() if not status['ok']),
+                'responses': dict(self._status)
+            }
+
+prewarmer = CachePrewarmer()
+
+def start_prewarmer():
+    """Start the background prewarmer when CACHE_PREWARM enables it (called by the server entry points)"""
+    if CACHE_PREWARM:
+        prewarmer.start()
+        logger.info(f"Cache prewarmer started (every {PREWARM_INTERVAL_SECONDS:.0f}s, "
+                    f"{PREWARM_CATEGORY_PAGES} page(s) per category)")
+
 @app.route('/api/stats', methods=['GET'])
 def get_statistics():
     """Statistics are not available in online mode"""
@@ -909,6 +1452,10 @@ def get_statistics():
             'note': 'Statistics are not available in online mode',
             'mode': 'online',
             'cache_duration_minutes': CACHE_DURATION_MINUTES,
+            'cache': response_cache.stats(),
+            'upstream': scraper.upstream.stats(),
+            'upstream_single_flight': scraper.inflight.stats(),
+            'prewarm': prewarmer.stats(),
             'categories': list(CATEGORIES.keys())
         }
     })
@@ -975,6 +1522,7 @@ def home():
         'notes': [
             'This API fetches data in real-time from piaohua.com',
             'Responses are cached for 30 minutes to reduce load',
+            'Expired responses are served (marked stale) while they are refreshed in the background',
             'Movie detail requires the full URL parameter',
             'Some features are optimized for performance'
         ]
@@ -997,6 +1545,8 @@ def internal_error(error):
 if __name__ == '__main__':
     logger.info("Starting Piaohua Movie API in ONLINE mode")
     logger.info(f"Cache duration: {CACHE_DURATION_MINUTES} minutes")
+    logger.info(f"Persistent cache: {ONLINE_CACHE_PATH or 'disabled'}")
     logger.info("Data will be fetched in real-time from piaohua.com")
     
+    start_prewarmer()
     app.run(debug=False, port=8080, host='0.0.0.0')
\ No newline at end of file
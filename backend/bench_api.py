@@ -0,0 +1,413 @@
+"""
+Benchmark suite for the offline API (app.py)
+
+Generates a schema-compatible synthetic catalog and drives every read
+endpoint through the Flask test client or a running server, reporting
+p50/p95/p99 latency and throughput per endpoint as JSON.
+
+    python bench_api.py generate --db bench.db --movies 100000
+    python bench_api.py run --db bench.db --out baseline.json
+    python bench_api.py run --db bench.db --compare baseline.json
+    python bench_api.py run --url http://127.0.0.1:8080 --concurrency 4
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+from movie_db import create_catalog_tables, migrate_database, rebuild_neighbors
+
+MOVIE_CATEGORY_IDS = [
+    '0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '11', '12', '13', '14', '15', '16', '17', '18', '19', '20'
+]
+OTHER_CATEGORY_IDS = ['zongyi2013', 'dongman']
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何林高罗郑梁谢宋唐许韩冯邓曹彭曾萧田董潘袁蔡蒋余杜叶程魏苏吕丁任卢姚沈钟姜崔谭陆范汪廖石金夏方邹熊白孟秦邱侯江尹薛段雷龙黎史陶贺毛顾龚邵万武钱戴严莫孔常汤康易乔赖文'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍红鹏飞宇浩然轩涵诺欣怡嘉豪俊雨思远晨曦子梓一德志'
+WESTERN_NAMES = [
+    'Tom Hanks', 'Meryl Streep', 'Keanu Reeves', 'Scarlett Johansson', 'Denzel Washington', 'Cate Blanchett',
+    'Leonardo DiCaprio', 'Natalie Portman', 'Christian Bale', 'Emma Stone', 'Ryan Gosling', 'Tilda Swinton'
+]
+TITLE_WORDS = [
+    '星际', '穿越', '流浪', '地球', '长安', '时辰', '无间', '霸王', '别姬', '西游', '英雄', '本色', '少年',
+    '江湖', '风云', '传奇', '秘密', '花园', '夜行', '追凶', '深海', '迷城', '归途', '烈火', '寒战', '破晓',
+    '天空', '之城', '孤岛', '惊魂', '狂飙', '奇迹', '山河', '故人', '月光', '宝藏', '迷雾', '猎人', '暗夜',
+    '重生', '战狼', '唐人街', '探案', '人生', '大事', '你好', '李焕英', '飞驰', '满江红', '封神', '误杀'
+]
+SYNOPSIS_WORDS = [
+    '一个', '普通', '家庭', '意外', '卷入', '一场', '跨越', '时空', '冒险', '命运', '交织', '真相', '逐渐',
+    '浮出', '水面', '他们', '必须', '面对', '过去', '选择', '城市', '深处', '隐藏', '秘密', '组织', '追查',
+    '失踪', '案件', '爱情', '友情', '背叛', '救赎', '成长', '梦想', '坚持', '最终', '找到', '答案'
+]
+GENRES = ['剧情', '喜剧', '动作', '爱情', '科幻', '动画', '悬疑', '惊悚', '恐怖', '纪录', '传记', '历史', '战争', '犯罪', '奇幻', '冒险', '武侠', '古装']
+COUNTRIES = ['中国大陆', '美国', '中国香港', '日本', '韩国', '英国', '法国', '中国台湾', '印度', '德国']
+LANGUAGES = ['国语', '英语', '粤语', '日语', '韩语', '法语']
+QUALITIES = ['1080p', '720p', '4K', 'HD国语中字', 'BD中英双字']
+LINK_TYPES = ['magnet', 'ftp', 'http']
+LINK_TYPE_WEIGHTS = [55, 35, 10]
+LINK_FANOUT = [0, 1, 2, 3, 4, 5, 6, 8]
+LINK_FANOUT_WEIGHTS = [5, 35, 30, 15, 6, 4, 3, 2]
+
+GENERATE_BATCH_SIZE = 5000
+
+
+def zipf_cum_weights(count, exponent=1.1):
+    """Cumulative weights so a few names are credited on many titles, like a real catalog"""
+    return list(itertools.accumulate(1 / (rank + 1) ** exponent for rank in range(count)))
+
+
+def make_people(rng, count):
+    """Distinct CJK (and a few western) names"""
+    names = list(WESTERN_NAMES)
+    seen = set(names)
+    while len(names) < count:
+        name = rng.choice(SURNAMES) + ''.join(rng.choices(GIVEN_NAMES, k=rng.choice((1, 2))))
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    rng.shuffle(names)
+    return names
+
+
+def synthetic_movies(count, seed=1):
+    """Yield (movie row, download link rows) tuples of a realistic catalog"""
+    rng = random.Random(seed)
+    people = make_people(rng, max(200, count // 5))
+    people_weights = zipf_cum_weights(len(people))
+    newest = datetime(2025, 6, 30)
+
+    for index in range(count):
+        movie_id = str(100000 + index)
+        if rng.random() < 0.9:
+            category_type, category = 'movie', rng.choice(MOVIE_CATEGORY_IDS)
+        else:
+            category_type, category = 'other', rng.choice(OTHER_CATEGORY_IDS)
+
+        title = ''.join(rng.sample(TITLE_WORDS, rng.choice((2, 2, 3))))
+        if rng.random() < 0.1:
+            title += str(rng.randint(2, 4))
+        year = str(min(2025, int(rng.triangular(1960, 2026, 2022))))
+        cast = rng.choices(people, cum_weights=people_weights, k=rng.randint(3, 8))
+        synopsis = '，'.join(
+            ''.join(rng.choices(SYNOPSIS_WORDS, k=rng.randint(4, 10))) for _ in range(rng.randint(3, 12))
+        ) + '。'
+        imdb = f"{rng.uniform(3, 9.5):.1f}/10 from {rng.randint(50, 900000):,} users" if rng.random() < 0.7 else ''
+        douban = f"{rng.uniform(3, 9.5):.1f}/10 from {rng.randint(50, 900000):,} users" if rng.random() < 0.6 else ''
+        published = newest - timedelta(days=(count - index) * 5000 / count, minutes=rng.randint(0, 1440))
+
+        movie = (
+            movie_id, title, f"Movie {index}", title, year, rng.choice(COUNTRIES),
+            json.dumps(rng.sample(GENRES, rng.randint(1, 3)), ensure_ascii=False),
+            rng.choice(LANGUAGES), '中文字幕', f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            imdb, douban, 'x264 + AAC', '1920 x 1080', f"{rng.uniform(0.7, 12):.2f} GB", f"{rng.randint(80, 180)}分钟",
+            rng.choices(people, cum_weights=people_weights)[0], json.dumps(list(dict.fromkeys(cast)), ensure_ascii=False),
+            synopsis, f"https://img.example.com/poster/{movie_id}.jpg",
+            json.dumps([f"https://img.example.com/shot/{movie_id}_{n}.jpg" for n in range(rng.randint(0, 3))]),
+            category, category_type, published.strftime('%Y-%m-%d %H:%M'),
+            f"https://www.example.com/html/{movie_id}.html", '{}'
+        )
+
+        links = []
+        fanout = rng.choices(LINK_FANOUT, weights=LINK_FANOUT_WEIGHTS)[0]
+        for number in range(fanout):
+            link_type = rng.choices(LINK_TYPES, weights=LINK_TYPE_WEIGHTS)[0]
+            prefix = {'magnet': 'magnet:?xt=urn:btih:', 'ftp': 'ftp://dl.example.com/', 'http': 'https://dl.example.com/'}[link_type]
+            links.append((movie_id, rng.choice(QUALITIES), f"{prefix}{movie_id}{number:02d}{rng.getrandbits(64):016x}", link_type))
+
+        yield movie, links
+
+
+def generate_catalog(db_path, count, seed=1, neighbors=True):
+    """Write a synthetic catalog with every derived table the API reads"""
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode = OFF')
+    conn.execute('PRAGMA synchronous = OFF')
+    create_catalog_tables(conn)
+
+    movie_sql = f"INSERT INTO movies (id, title, translated_name, original_name, year, country, genre, language, subtitles, release_date, imdb_rating, douban_rating, file_format, video_size, file_size, duration, director, cast, synopsis, poster, screenshots, category, category_type, publish_date, page_url, raw_data) VALUES ({', '.join('?' * 26)})"
+    link_sql = 'INSERT INTO download_links (movie_id, quality, link, type) VALUES (?, ?, ?, ?)'
+
+    started = time.perf_counter()
+    movies, links = [], []
+    for movie, movie_links in synthetic_movies(count, seed):
+        movies.append(movie)
+        links.extend(movie_links)
+        if len(movies) >= GENERATE_BATCH_SIZE:
+            conn.executemany(movie_sql, movies)
+            conn.executemany(link_sql, links)
+            movies, links = [], []
+    conn.executemany(movie_sql, movies)
+    conn.executemany(link_sql, links)
+    conn.commit()
+    print(f"Inserted {count} movies in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    migrate_database(conn)
+    print(f"Built indexes, search index and aggregates in {time.perf_counter() - started:.1f}s")
+
+    if neighbors:
+        started = time.perf_counter()
+        rebuild_neighbors(conn)
+        conn.commit()
+        print(f"Built related titles in {time.perf_counter() - started:.1f}s")
+
+    conn.execute('ANALYZE')
+    conn.commit()
+    conn.close()
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of sorted samples"""
+    index = max(0, min(len(samples) - 1, int(round(fraction * len(samples) + 0.5)) - 1))
+    return samples[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """Latency percentiles (ms) and throughput of one endpoint run"""
+    samples = sorted(latencies)
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'p50_ms': round(percentile(samples, 0.50), 3),
+        'p95_ms': round(percentile(samples, 0.95), 3),
+        'p99_ms': round(percentile(samples, 0.99), 3),
+        'mean_ms': round(statistics.fmean(samples), 3),
+        'max_ms': round(samples[-1], 3),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0
+    }
+
+
+class Target:
+    """Issues GET requests against the Flask test client or a running server"""
+
+    def __init__(self, url=None, headers=None):
+        self.url = url.rstrip('/') if url else None
+        self.headers = headers or {}
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            if self.url:
+                import requests
+                client = requests.Session()
+                client.headers.update(self.headers)
+            else:
+                from app import app
+                client = app.test_client()
+            self._local.client = client
+        return client
+
+    def get(self, path):
+        """(status code, decoded JSON or None) of a GET request"""
+        client = self._client()
+        if self.url:
+            response = client.get(self.url + path, timeout=60)
+            return response.status_code, response.content
+        response = client.get(path, headers=self.headers)
+        return response.status_code, response.data
+
+    def get_json(self, path):
+        status, body = self.get(path)
+        return json.loads(body) if status == 200 else None
+
+
+def walk_cursors(target, path, pages):
+    """Next-page cursors of a listing, following them up to the given page"""
+    cursors = []
+    for _ in range(max(pages - 1, 1)):
+        query = f'&cursor={cursors[-1]}' if cursors else ''
+        cursor = target.get_json(path + query)['data']['pagination'].get('next_cursor')
+        if not cursor:
+            break
+        cursors.append(cursor)
+    return cursors
+
+
+def build_scenarios(target, rng):
+    """Endpoint name -> callable returning the next request path"""
+    categories = target.get_json('/api/categories')['data']
+    movie_categories = [category for category in categories['movies'] if category['count']]
+    category_ids = [category['id'] for category in movie_categories]
+    largest = max(movie_categories, key=lambda category: category['count'])
+
+    latest = target.get_json('/api/latest?limit=100')['data']['movies']
+    sample_ids = [movie['id'] for movie in latest]
+    for category_id in category_ids[:5]:
+        page = target.get_json(f'/api/movies/movie/{category_id}?per_page=100')['data']
+        sample_ids.extend(movie['id'] for movie in page['movies'])
+
+    titles = [movie['title'] for movie in latest if movie.get('title')]
+    long_keywords = [title[:3] for title in titles if len(title) >= 3] or ['星际穿']
+    short_keywords = [title[:2] for title in titles if len(title) >= 2] or ['星际']
+
+    deep_pages = max(1, min(largest['count'] // 30, 200))
+    cursors = walk_cursors(target, f"/api/movies/movie/{largest['id']}?per_page=30", deep_pages)
+
+    scenarios = {
+        'categories': lambda: '/api/categories',
+        'category_page': lambda: f"/api/movies/movie/{rng.choice(category_ids)}?per_page=30",
+        'category_deep_page': lambda: f"/api/movies/movie/{largest['id']}?per_page=30&page={rng.randint(1, deep_pages)}",
+        'category_cursor': lambda: f"/api/movies/movie/{largest['id']}?per_page=30&cursor={rng.choice(cursors)}",
+        'category_sort_imdb': lambda: f"/api/movies/movie/{rng.choice(category_ids)}?per_page=30&sort=imdb",
+        'category_full_page': lambda: f"/api/movies/movie/{rng.choice(category_ids)}?per_page=100&include=all",
+        'movie_detail': lambda: f"/api/movie/{rng.choice(sample_ids)}",
+        'movies_batch': lambda: f"/api/movies/batch?ids={','.join(rng.sample(sample_ids, min(50, len(sample_ids))))}",
+        'search': lambda: f"/api/search?keyword={quote(rng.choice(long_keywords))}",
+        'search_short': lambda: f"/api/search?keyword={quote(rng.choice(short_keywords))}",
+        'latest': lambda: '/api/latest?limit=50',
+        'home': lambda: '/api/home',
+        'stats': lambda: '/api/stats',
+    }
+    if not cursors:  # a single page, nothing to paginate to
+        del scenarios['category_cursor']
+    return scenarios
+
+
+def run_endpoint(target, next_path, requests_count, warmup, concurrency):
+    """Latency summary of one endpoint"""
+    for _ in range(warmup):
+        target.get(next_path())
+
+    paths = [next_path() for _ in range(requests_count)]
+    latencies = []
+    errors = 0
+
+    def timed(path):
+        start = time.perf_counter()
+        status, _ = target.get(path)
+        return (time.perf_counter() - start) * 1000, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, status in executor.map(timed, paths):
+            latencies.append(latency)
+            if status != 200:
+                errors += 1
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def catalog_info(db_path):
+    """Size of the catalog a run was measured against"""
+    if not db_path or not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        return {
+            'path': os.path.abspath(db_path),
+            'movies': conn.execute('SELECT COUNT(*) FROM movies').fetchone()[0],
+            'download_links': conn.execute('SELECT COUNT(*) FROM download_links').fetchone()[0],
+            'file_bytes': os.path.getsize(db_path)
+        }
+    finally:
+        conn.close()
+
+
+def compare(results, baseline_path):
+    """Print latency changes against an earlier run"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['endpoints']
+
+    print(f"\n{'endpoint':<22}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}{'rps':>18}")
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        cells = []
+        for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+            change = (current[metric] - before[metric]) / before[metric] * 100 if before[metric] else 0
+            cells.append(f"{current[metric]:>9} {change:+6.1f}%")
+        print(f"{name:<22}" + ''.join(f"{cell:>18}" for cell in cells))
+
+
+def run(args):
+    if not args.url:
+        if not args.response_cache:
+            os.environ['RESPONSE_CACHE_MAX_BYTES'] = '0'
+        import app as offline_api
+        offline_api.DB_PATH = os.path.abspath(args.db)
+        offline_api.db_pool.db_path = offline_api.DB_PATH
+        offline_api.db_pool.close_all()
+        offline_api.init_database()
+
+    target = Target(args.url, {'Accept-Encoding': args.accept_encoding})
+    scenarios = build_scenarios(target, random.Random(args.seed))
+    if args.endpoints:
+        scenarios = {name: scenarios[name] for name in args.endpoints if name in scenarios}
+
+    results = {}
+    for name, next_path in scenarios.items():
+        results[name] = run_endpoint(target, next_path, args.requests, args.warmup, args.concurrency)
+        summary = results[name]
+        print(f"{name:<22} p50 {summary['p50_ms']:>8.2f} ms  p95 {summary['p95_ms']:>8.2f} ms  "
+              f"p99 {summary['p99_ms']:>8.2f} ms  {summary['throughput_rps']:>8.1f} req/s  errors {summary['errors']}")
+
+    report = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'target': args.url or 'test-client',
+            'catalog': catalog_info(None if args.url else args.db),
+            'requests_per_endpoint': args.requests,
+            'concurrency': args.concurrency,
+            'accept_encoding': args.accept_encoding,
+            'response_cache': bool(args.url or args.response_cache),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version
+        },
+        'endpoints': results
+    }
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nWrote {args.out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the offline movie API')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='Create a synthetic catalog')
+    generate.add_argument('--db', default='bench.db', help='Database file to (re)create')
+    generate.add_argument('--movies', type=int, default=10000, help='Number of movies')
+    generate.add_argument('--seed', type=int, default=1, help='Random seed')
+    generate.add_argument('--skip-neighbors', action='store_true', help='Do not precompute related titles')
+
+    bench = commands.add_parser('run', help='Measure endpoint latency')
+    bench.add_argument('--db', default='bench.db', help='Database file (test client mode)')
+    bench.add_argument('--url', help='Base URL of a running server instead of the test client')
+    bench.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+    bench.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint')
+    bench.add_argument('--concurrency', type=int, default=1, help='Concurrent requests')
+    bench.add_argument('--endpoints', nargs='+', help='Only these endpoints')
+    bench.add_argument('--accept-encoding', default='identity', help='Accept-Encoding header sent with every request')
+    bench.add_argument('--response-cache', action='store_true', help='Keep the response cache enabled (test client mode)')
+    bench.add_argument('--seed', type=int, default=1, help='Random seed for request parameters')
+    bench.add_argument('--out', help='Write the JSON report here')
+    bench.add_argument('--compare', help='Baseline JSON report to compare against')
+
+    args = parser.parse_args()
+    if args.command == 'generate':
+        generate_catalog(args.db, args.movies, args.seed, neighbors=not args.skip_neighbors)
+    else:
+        run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Microbenchmark of JSON serialization on real API payloads
+
+Loads /api/home and a per_page=100 category page from movies.db through
+the offline API, then times Flask's default provider (compact and pretty)
+against FastJSONProvider on the same objects.
+
+    python bench_json.py --db movies.db --rounds 200
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+
+def time_calls(func, rounds):
+    """Median and best wall time of func() in milliseconds"""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), min(samples)
+
+
+def load_payloads(app):
+    """Response objects of the heaviest read endpoints, decoded back into Python"""
+    client = app.test_client()
+    payloads = {}
+
+    home = client.get('/api/home')
+    payloads['/api/home'] = home.get_json()
+
+    # Largest movie category, full page of cards
+    categories = client.get('/api/categories').get_json()['data']['movies']
+    if categories:
+        largest = max(categories, key=lambda category: category['count'])
+        url = f"/api/movies/movie/{largest['id']}?per_page=100"
+        payloads[url] = client.get(url).get_json()
+
+    return payloads
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON providers on API payloads')
+    parser.add_argument('--db', default='movies.db', help='Database file path')
+    parser.add_argument('--rounds', type=int, default=200, help='Serializations per provider')
+    args = parser.parse_args()
+
+    os.environ['RESPONSE_CACHE_MAX_BYTES'] = '0'
+
+    from flask.json.provider import DefaultJSONProvider
+    import app as offline_api
+    from json_provider import FastJSONProvider
+
+    offline_api.DB_PATH = os.path.abspath(args.db)
+    offline_api.db_pool.db_path = offline_api.DB_PATH
+    offline_api.db_pool.close_all()
+    offline_api.init_database()
+    app = offline_api.app
+
+    default = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    providers = {
+        'flask compact': lambda obj: default.dumps(obj).encode('utf-8'),
+        'flask pretty': lambda obj: default.dumps(obj, indent=2).encode('utf-8'),
+        f'fast ({fast.backend}) compact': lambda obj: fast.dumps_bytes(obj),
+        f'fast ({fast.backend}) pretty': lambda obj: fast.dumps_bytes(obj, pretty=True),
+    }
+
+    for url, payload in load_payloads(app).items():
+        print(f"\n{url}")
+        baseline = None
+        for name, dumps in providers.items():
+            size = len(dumps(payload))
+            median, best = time_calls(lambda: dumps(payload), args.rounds)
+            baseline = baseline or median
+            print(f"  {name:<24} {size / 1024:8.1f} KB  median {median:7.3f} ms  best {best:7.3f} ms  x{baseline / median:5.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+"""
+In-memory bitmap index behind /api/browse
+
+Every movie gets a position in publish order (newest first) and every
+filterable value a bitmap of the movies having it, stored as a Python int
+with one bit per position. A filter is a handful of AND/ORs over those
+ints, each facet count a bit_count() of the result ANDed with the value's
+bitmap, and a page of results the next set bits of the result, so browsing
+costs the same whatever the filters match.
+"""
+
+import threading
+import time
+from collections import defaultdict
+
+from movie_db import split_people
+
+# Score filters are exact to one decimal, like the ratings themselves
+SCORE_STEPS = 10
+MAX_SCORE_KEY = 10 * SCORE_STEPS
+
+# Bytes of the result bitmap counted per step while skipping to a page
+SCAN_CHUNK_BYTES = 512
+
+MULTI_VALUE_FACETS = ('genre', 'country', 'language')
+
+
+def bitmap(positions, size):
+    """Int with the given bit positions set, built in one pass over a byte buffer"""
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def score_key(score):
+    """Integer bucket of a score (7.56 -> 75)"""
+    return min(max(int(score * SCORE_STEPS + 1e-9), 0), MAX_SCORE_KEY)
+
+
+def min_score_key(score):
+    """Smallest bucket whose movies all score at least `score`"""
+    key = score * SCORE_STEPS
+    return min(max(int(key) + (0 if key == int(key) else 1), 0), MAX_SCORE_KEY + 1)
+
+
+class BrowseIndex:
+    """Bitmaps of one data version of the catalog"""
+
+    def __init__(self, conn, version):
+        started = time.perf_counter()
+        self.version = version
+
+        rows = conn.execute('''
+            SELECT id, category_type, category, country, language, year_int, imdb_score, douban_score,
+                   EXISTS (SELECT 1 FROM download_links WHERE movie_id = movies.id AND type = 'magnet') AS has_magnet
+            FROM movies
+            ORDER BY publish_ts DESC, id DESC
+        ''').fetchall()
+
+        self.ids = [row[0] for row in rows]
+        position = {movie_id: index for index, movie_id in enumerate(self.ids)}
+        self.size = len(self.ids)
+        self.all = (1 << self.size) - 1
+
+        # Positions per value first, each bitmap is then built in a single pass
+        positions = {name: defaultdict(list) for name in ('type', 'category', 'genre', 'country', 'language', 'year')}
+        score_positions = {'imdb': defaultdict(list), 'douban': defaultdict(list)}
+        magnet_positions = []
+        # Few distinct country / language strings repeat across the catalog
+        split = {}
+
+        for index, (_, category_type, category, country, language, year, imdb, douban, has_magnet) in enumerate(rows):
+            positions['type'][category_type or ''].append(index)
+            positions['category'][f"{category_type}/{category}"].append(index)
+            for facet, text in (('country', country), ('language', language)):
+                names = split.get(text)
+                if names is None:
+                    names = split[text] = split_people(text)
+                for name in names:
+                    positions[facet][name].append(index)
+            if year is not None:
+                positions['year'][year].append(index)
+            if imdb is not None:
+                score_positions['imdb'][score_key(imdb)].append(index)
+            if douban is not None:
+                score_positions['douban'][score_key(douban)].append(index)
+            if has_magnet:
+                magnet_positions.append(index)
+
+        for genre, movie_id in conn.execute('SELECT genre, movie_id FROM movie_genres'):
+            index = position.get(movie_id)
+            if index is not None:
+                positions['genre'][genre].append(index)
+
+        self.values = {
+            name: {value: bitmap(indexes, self.size) for value, indexes in by_value.items()}
+            for name, by_value in positions.items()
+        }
+        self.has_magnet = bitmap(magnet_positions, self.size)
+
+        # at_least[k]: movies scoring k / SCORE_STEPS or more
+        self.at_least = {}
+        for name, by_key in score_positions.items():
+            cumulative = [0] * (MAX_SCORE_KEY + 2)
+            for key in range(MAX_SCORE_KEY, -1, -1):
+                cumulative[key] = cumulative[key + 1] | bitmap(by_key.get(key, ()), self.size)
+            self.at_least[name] = cumulative
+
+        self.build_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def filter(self, category_type=None, category=None, genres=(), countries=(), languages=(),
+               year_from=None, year_to=None, min_imdb=None, min_douban=None, has_magnet=False):
+        """Bitmap of the movies matching every given filter"""
+        result = self.all
+        if category_type:
+            result &= self.values['type'].get(category_type, 0)
+        if category:
+            result &= self.values['category'].get(f"{category_type}/{category}", 0)
+        for genre in genres:
+            result &= self.values['genre'].get(genre, 0)
+        for facet, wanted in (('country', countries), ('language', languages)):
+            if wanted:
+                any_of = 0
+                for value in wanted:
+                    any_of |= self.values[facet].get(value, 0)
+                result &= any_of
+        if year_from is not None or year_to is not None:
+            in_range = 0
+            for year, movies in self.values['year'].items():
+                if (year_from is None or year >= year_from) and (year_to is None or year <= year_to):
+                    in_range |= movies
+            result &= in_range
+        for name, minimum in (('imdb', min_imdb), ('douban', min_douban)):
+            if minimum is not None:
+                result &= self.at_least[name][min_score_key(minimum)]
+        if has_magnet:
+            result &= self.has_magnet
+        return result
+
+    def facets(self, result, limit=50):
+        """Counts of each genre / country / language / year within a result, largest first"""
+        facets = {}
+        for name in MULTI_VALUE_FACETS + ('year',):
+            counts = []
+            for value, movies in self.values[name].items():
+                count = (result & movies).bit_count()
+                if count:
+                    counts.append({'value': value, 'count': count})
+            counts.sort(key=lambda item: (-item['count'], str(item['value'])))
+            facets[name] = counts[:limit]
+        facets['has_magnet'] = (result & self.has_magnet).bit_count()
+        return facets
+
+    def page(self, result, offset, limit):
+        """Movie ids at the offset-th..(offset+limit)-th set bits of a result, in publish order"""
+        data = result.to_bytes((self.size + 7) // 8, 'little')
+        ids = []
+        for start in range(0, len(data), SCAN_CHUNK_BYTES):
+            chunk = int.from_bytes(data[start:start + SCAN_CHUNK_BYTES], 'little')
+            if not chunk:
+                continue
+            count = chunk.bit_count()
+            if offset >= count:
+                offset -= count
+                continue
+            base = start * 8
+            while chunk and len(ids) < limit:
+                low = chunk & -chunk
+                if offset:
+                    offset -= 1
+                else:
+                    ids.append(self.ids[base + low.bit_length() - 1])
+                chunk ^= low
+            if len(ids) >= limit:
+                break
+        return ids
+
+    def stats(self):
+        """Size of the index for the stats endpoint"""
+        bitmaps = sum(len(bitmaps) for bitmaps in self.values.values()) + 2 * (MAX_SCORE_KEY + 2) + 2
+        return {
+            'movies': self.size,
+            'bitmaps': bitmaps,
+            'approx_bytes': bitmaps * ((self.size + 7) // 8),
+            'build_ms': self.build_ms
+        }
+
+
+class BrowseIndexCache:
+    """Holds the index of the current data version, rebuilding it after the catalog changes"""
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def get(self, conn, version):
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            if self._index is None or self._index.version != version:
+                self._index = BrowseIndex(conn, version)
+            return self._index
+
+    def stats(self):
+        index = self._index
+        return index.stats() if index is not None else None
@@ -0,0 +1,82 @@
+"""
+Response compression shared by the offline (app.py) and online (app_online.py) APIs
+
+Negotiates brotli (when the brotli package is installed) or gzip from the
+request's Accept-Encoding header and leaves bodies below a size threshold
+untouched, where the compression overhead would not pay off.
+"""
+
+import gzip
+import os
+
+from flask import request, has_request_context
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+
+# Levels tuned for per-request compression of JSON
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', 5))
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain')
+
+# Server preference when the client weighs encodings equally
+ENCODINGS = (['br'] if brotli is not None else []) + ['gzip']
+
+
+def negotiate_encoding():
+    """Best content encoding the current request accepts, or None"""
+    if not has_request_context():
+        return None
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def compress(body, encoding):
+    """Body compressed with the given encoding"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encode_body(body, encoding):
+    """(body, applied encoding) for a negotiated encoding, skipping small bodies"""
+    if encoding is None or len(body) < COMPRESSION_MIN_BYTES:
+        return body, None
+    return compress(body, encoding), encoding
+
+
+def set_encoded_body(response, body, encoding):
+    """Put an already encoded body on a response with its negotiation headers"""
+    response.set_data(body)
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def compress_response(response):
+    """after_request hook compressing responses nobody encoded yet"""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    body, encoding = encode_body(response.get_data(), negotiate_encoding())
+    if encoding is not None and response.get_etag()[0]:
+        # The compressed bytes differ, so the validator can no longer be strong
+        response.set_etag(response.get_etag()[0], weak=True)
+    return set_encoded_body(response, body, encoding)
+
+
+def init_compression(app):
+    """Compress every eligible response of a Flask app"""
+    app.after_request(compress_response)
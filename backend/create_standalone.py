@@ -34,6 +34,10 @@ def create_standalone():
         "--hidden-import", "requests",
         "--hidden-import", "bs4",
         "--hidden-import", "beautifulsoup4",
+        "--hidden-import", "orjson",
+        "--hidden-import", "brotli",
+        "--hidden-import", "httpx",
+        "--hidden-import", "h2",
         "app_online.py"
     ]
     
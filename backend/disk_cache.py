@@ -0,0 +1,138 @@
+"""
+Persistent store behind the online API's response cache (app_online.py)
+
+Cached responses are kept in a small SQLite file as JSON text together with
+their expiry, so a relaunched backend answers from what the previous run
+fetched instead of scraping piaohua.com again. The file is in WAL mode with
+a busy timeout, so several server processes can share it: readers never
+block and writers briefly queue on SQLite's lock. Any storage error is
+logged and treated as a miss, the cache never fails a request.
+"""
+
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows kept on disk, the least recently stored are pruned beyond this
+DISK_CACHE_MAX_ENTRIES = int(os.environ.get('DISK_CACHE_MAX_ENTRIES', 5000))
+
+# Expired and surplus rows are pruned every this many writes (and on open)
+PRUNE_EVERY_WRITES = 200
+
+BUSY_TIMEOUT_SECONDS = 5
+
+
+def default_cache_path():
+    """Per-user cache file, outside the application bundle (read-only or temporary when frozen)"""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'ByteStream', 'online_cache.db')
+
+
+class DiskCache:
+    """(type, key) -> (JSON text, expiry timestamp) rows in a SQLite file"""
+
+    def __init__(self, path, max_entries=DISK_CACHE_MAX_ENTRIES, keep_expired=0):
+        self.path = path
+        self.max_entries = max_entries
+        self.keep_expired = keep_expired
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._reads = 0
+        self._hits = 0
+        self._errors = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                cache_type TEXT NOT NULL,
+                key TEXT NOT NULL,
+                data TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                stored_at REAL NOT NULL,
+                PRIMARY KEY (cache_type, key)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_cache_entries_stored_at ON cache_entries (stored_at)')
+        self.prune()
+
+    def get(self, key):
+        """(JSON text, expires_at) stored for a (type, key), or None"""
+        try:
+            with self._lock:
+                self._reads += 1
+                row = self._conn.execute(
+                    'SELECT data, expires_at FROM cache_entries WHERE cache_type = ? AND key = ?', key
+                ).fetchone()
+                if row is not None:
+                    self._hits += 1
+            return row
+        except sqlite3.Error as e:
+            self._failed('read', e)
+            return None
+
+    def set(self, key, text, expires_at):
+        """Store JSON text for a (type, key) until expires_at"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (cache_type, key, data, expires_at, stored_at) VALUES (?, ?, ?, ?, ?)',
+                    (*key, text, expires_at, time.time())
+                )
+                self._writes += 1
+                prune = self._writes % PRUNE_EVERY_WRITES == 0
+            if prune:
+                self.prune()
+        except sqlite3.Error as e:
+            self._failed('write', e)
+
+    def prune(self, now=None):
+        """Drop rows expired for longer than keep_expired, then the least recently stored beyond max_entries"""
+        now = time.time() if now is None else now
+        try:
+            with self._lock:
+                self._conn.execute('DELETE FROM cache_entries WHERE expires_at <= ?', (now - self.keep_expired,))
+                self._conn.execute('''
+                    DELETE FROM cache_entries WHERE stored_at <= (
+                        SELECT stored_at FROM cache_entries ORDER BY stored_at DESC LIMIT 1 OFFSET ?
+                    )
+                ''', (self.max_entries,))
+        except sqlite3.Error as e:
+            self._failed('prune', e)
+
+    def _failed(self, operation, error):
+        self._errors += 1
+        logger.warning(f"Disk cache {operation} failed ({self.path}): {error}")
+
+    def stats(self):
+        """Store counters for the stats endpoint"""
+        try:
+            with self._lock:
+                entries = self._conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {
+            'path': self.path,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'reads': self._reads,
+            'hits': self._hits,
+            'writes': self._writes,
+            'errors': self._errors
+        }
@@ -0,0 +1,71 @@
+"""
+JSON provider shared by the offline (app.py) and online (app_online.py) APIs
+
+Serializes with orjson when it is installed and falls back to the standard
+library otherwise. Output is compact UTF-8; add ?pretty=1 to a request to
+get indented output for debugging.
+"""
+
+import json
+
+from flask import request, has_request_context
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+PRETTY_VALUES = ('1', 'true', 'yes')
+
+
+def pretty_requested():
+    """True when the current request asks for indented JSON"""
+    return has_request_context() and request.args.get('pretty', '').lower() in PRETTY_VALUES
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Compact, non-ASCII-escaped JSON, produced by orjson when available"""
+
+    ensure_ascii = False
+    sort_keys = False
+    compact = True
+
+    @property
+    def backend(self):
+        """Name of the serializer in use"""
+        return 'orjson' if orjson is not None else 'json'
+
+    def dumps_bytes(self, obj, pretty=False):
+        """Serialize obj to UTF-8 bytes"""
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            return orjson.dumps(obj, default=self.default, option=option)
+
+        if pretty:
+            text = json.dumps(obj, default=self.default, ensure_ascii=False, sort_keys=self.sort_keys, indent=2)
+        else:
+            text = json.dumps(obj, default=self.default, ensure_ascii=False, sort_keys=self.sort_keys, separators=(',', ':'))
+        return text.encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            return json.dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self.dumps_bytes(obj, pretty=pretty_requested())
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,795 @@
+"""
+Schema helpers for the DYTT8899 movie catalog (movies.db)
+
+Shared by the crawler that writes the catalog (tiantang.py) and the
+offline API that reads it (app.py). Every helper is idempotent, so it is
+safe to run on each crawler start and on each API start.
+"""
+
+import sqlite3
+import logging
+import re
+import json
+import heapq
+import calendar
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+# Columns indexed for /api/search, with their bm25 weights
+SEARCH_COLUMNS = {
+    'title': 10.0,
+    'translated_name': 8.0,
+    'original_name': 8.0,
+    'director': 4.0,
+    'cast': 4.0,
+    'synopsis': 1.0,
+    'genre': 2.0,
+    'country': 1.0,
+}
+
+# The trigram tokenizer cannot match keywords shorter than this
+SEARCH_MIN_KEYWORD_LENGTH = 3
+
+
+def quote_identifier(name):
+    """Quote a column name (``cast`` is an SQL keyword)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def table_exists(conn, name):
+    """Check whether a table or virtual table exists"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def supports_trigram(conn):
+    """Check whether this SQLite build has FTS5 with the trigram tokenizer"""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.trigram_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def create_catalog_tables(conn):
+    """Base movies / download_links tables written by the crawler"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movies (
+            id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            translated_name TEXT,
+            original_name TEXT,
+            year TEXT,
+            country TEXT,
+            genre TEXT,
+            language TEXT,
+            subtitles TEXT,
+            release_date TEXT,
+            imdb_rating TEXT,
+            douban_rating TEXT,
+            file_format TEXT,
+            video_size TEXT,
+            file_size TEXT,
+            duration TEXT,
+            director TEXT,
+            cast TEXT,
+            synopsis TEXT,
+            poster TEXT,
+            screenshots TEXT,
+            category TEXT,
+            category_type TEXT,
+            publish_date TEXT,
+            page_url TEXT,
+            scrape_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            raw_data TEXT
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS download_links (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id TEXT NOT NULL,
+            quality TEXT,
+            link TEXT NOT NULL,
+            type TEXT,
+            FOREIGN KEY (movie_id) REFERENCES movies (id)
+        )
+    ''')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movies_category ON movies (category)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movies_category_type ON movies (category_type)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_download_links_movie_id ON download_links (movie_id)')
+
+
+def ensure_search_index(conn):
+    """Create the movies_fts full-text index and the triggers that keep it in sync
+
+    movies has a TEXT primary key, so VACUUM may renumber its implicit
+    rowids. The index is keyed by movie_search_keys instead, whose INTEGER
+    PRIMARY KEY is stable, and reads the indexed text through the
+    movies_search view. An older index keyed by movies.rowid is dropped
+    and rebuilt.
+    """
+    if table_exists(conn, 'movie_search_keys'):
+        return True
+
+    if not supports_trigram(conn):
+        logger.warning("SQLite has no FTS5 trigram tokenizer, search will fall back to LIKE scans")
+        return False
+
+    columns = ', '.join(quote_identifier(c) for c in SEARCH_COLUMNS)
+    movie_values = ', '.join(f"m.{quote_identifier(c)}" for c in SEARCH_COLUMNS)
+    new_values = ', '.join(f"new.{quote_identifier(c)}" for c in SEARCH_COLUMNS)
+    old_values = ', '.join(f"old.{quote_identifier(c)}" for c in SEARCH_COLUMNS)
+
+    for trigger in ('movies_fts_ai', 'movies_fts_ad', 'movies_fts_au'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS movies_fts')
+    conn.execute('DROP VIEW IF EXISTS movies_search')
+
+    conn.execute('''
+        CREATE TABLE movie_search_keys (
+            id INTEGER PRIMARY KEY,
+            movie_id TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('INSERT INTO movie_search_keys (movie_id) SELECT id FROM movies')
+    conn.execute(f'''
+        CREATE VIEW movies_search AS
+        SELECT k.id AS search_id, {movie_values}
+        FROM movie_search_keys k
+        JOIN movies m ON m.id = k.movie_id
+    ''')
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE movies_fts USING fts5(
+            {columns},
+            content='movies_search',
+            content_rowid='search_id',
+            tokenize='trigram'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER movies_fts_ai AFTER INSERT ON movies BEGIN
+            INSERT OR IGNORE INTO movie_search_keys (movie_id) VALUES (new.id);
+            INSERT INTO movies_fts (rowid, {columns})
+            SELECT id, {new_values} FROM movie_search_keys WHERE movie_id = new.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER movies_fts_ad AFTER DELETE ON movies BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, {columns})
+            SELECT 'delete', id, {old_values} FROM movie_search_keys WHERE movie_id = old.id;
+            DELETE FROM movie_search_keys WHERE movie_id = old.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER movies_fts_au AFTER UPDATE OF id, {columns} ON movies BEGIN
+            INSERT INTO movies_fts (movies_fts, rowid, {columns})
+            SELECT 'delete', id, {old_values} FROM movie_search_keys WHERE movie_id = old.id;
+            UPDATE movie_search_keys SET movie_id = new.id WHERE movie_id = old.id;
+            INSERT INTO movies_fts (rowid, {columns})
+            SELECT id, {new_values} FROM movie_search_keys WHERE movie_id = new.id;
+        END
+    ''')
+
+    rebuild_search_index(conn)
+    logger.info("Created movies_fts search index")
+    return True
+
+
+def rebuild_search_index(conn):
+    """Re-index every movie from the movies_search view"""
+    conn.execute("INSERT INTO movies_fts (movies_fts) VALUES ('rebuild')")
+
+
+def parse_score(text):
+    """Leading number of a rating such as '7.5/10 from 1,234 users', or None"""
+    if not text:
+        return None
+    match = re.search(r'\d+(?:\.\d+)?', str(text))
+    if not match:
+        return None
+    score = float(match.group())
+    return score if 0 <= score <= 10 else None
+
+
+def parse_year(text):
+    """First plausible four digit year in free-form text, or None"""
+    if not text:
+        return None
+    match = re.search(r'(?<!\d)(?:18|19|20)\d{2}(?!\d)', str(text))
+    return int(match.group()) if match else None
+
+
+def parse_publish_ts(text):
+    """Unix timestamp (UTC) of a date like '2025-07-15', '2025/7/15 12:30' or '2025年7月15日', or None"""
+    if not text:
+        return None
+    match = re.search(
+        r'(\d{4})\D{1,2}(\d{1,2})\D{1,2}(\d{1,2})(?:\D{1,3}(\d{1,2}):(\d{2})(?::(\d{2}))?)?',
+        str(text)
+    )
+    if not match:
+        return None
+    parts = [int(part) if part else 0 for part in match.groups()]
+    try:
+        return calendar.timegm(tuple(parts) + (0, 0, 0))
+    except (OverflowError, ValueError):
+        return None
+
+
+# Typed sort columns: column -> (SQL type, source text column, parser)
+SORT_COLUMNS = {
+    'imdb_score': ('REAL', 'imdb_rating', parse_score),
+    'douban_score': ('REAL', 'douban_rating', parse_score),
+    'year_int': ('INTEGER', 'year', parse_year),
+    'publish_ts': ('INTEGER', 'publish_date', parse_publish_ts),
+}
+
+
+def sort_values(movie):
+    """Typed sort column values for a movie dict, computed by the crawler at write time"""
+    return {
+        column: parser(movie.get(source))
+        for column, (_, source, parser) in SORT_COLUMNS.items()
+    }
+
+
+def missing_sort_columns(conn):
+    """Typed sort columns the movies table does not have yet"""
+    existing = {row[1] for row in conn.execute('PRAGMA table_info(movies)')}
+    return [column for column in SORT_COLUMNS if column not in existing]
+
+
+def ensure_sort_columns(conn):
+    """Add the typed sort columns, backfilling them for rows written before they existed"""
+    missing = missing_sort_columns(conn)
+    for column in missing:
+        conn.execute(f'ALTER TABLE movies ADD COLUMN {column} {SORT_COLUMNS[column][0]}')
+
+    if missing:
+        backfill_sort_columns(conn)
+        logger.info(f"Added sort columns: {', '.join(missing)}")
+
+
+def backfill_sort_columns(conn):
+    """Recompute every typed sort column from its text column"""
+    assignments = []
+    for column, (_, source, parser) in SORT_COLUMNS.items():
+        conn.create_function(f'parse_{column}', 1, parser, deterministic=True)
+        assignments.append(f'{column} = parse_{column}({source})')
+    conn.execute(f"UPDATE movies SET {', '.join(assignments)}")
+
+
+# Listing orders served by app.py, each is (sort column, id) DESC within the prefix
+LISTING_INDEXES = {
+    'idx_movies_category_publish_ts': ('category_type', 'category', 'publish_ts', 'id'),
+    'idx_movies_category_year_int': ('category_type', 'category', 'year_int', 'id'),
+    'idx_movies_category_imdb_score': ('category_type', 'category', 'imdb_score', 'id'),
+    'idx_movies_category_douban_score': ('category_type', 'category', 'douban_score', 'id'),
+    'idx_movies_type_publish_ts': ('category_type', 'publish_ts', 'id'),
+    'idx_movies_publish_ts': ('publish_ts', 'id'),
+}
+
+# Superseded by the publish_ts indexes above
+OBSOLETE_INDEXES = ['idx_movies_category_publish', 'idx_movies_type_publish', 'idx_movies_publish']
+
+
+def ensure_listing_indexes(conn):
+    """Composite indexes so every listing order is read straight from an index"""
+    for name in OBSOLETE_INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+    for name, columns in LISTING_INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON movies ({', '.join(columns)})")
+
+    # Covers the has_magnet / has_ftp lookups of card listings
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_download_links_movie_type ON download_links (movie_id, type)')
+
+
+# Per-movie contributions to movie_aggregates: (metric, dim1, dim2, value, condition).
+# {row} is replaced by new/old inside triggers and by the table alias when rebuilding.
+MOVIE_AGGREGATES = [
+    ("'movies'", "''", "''", "1", "1"),
+    ("'imdb'", "''", "''", "1", "{row}.imdb_rating IS NOT NULL AND {row}.imdb_rating != ''"),
+    ("'douban'", "''", "''", "1", "{row}.douban_rating IS NOT NULL AND {row}.douban_rating != ''"),
+    ("'type'", "COALESCE({row}.category_type, '')", "''", "1", "1"),
+    ("'category'", "COALESCE({row}.category_type, '')", "COALESCE({row}.category, '')", "1", "1"),
+    ("'year'", "{row}.year", "''", "1", "{row}.year IS NOT NULL"),
+]
+
+UPSERT_AGGREGATE = '''
+    INSERT INTO movie_aggregates (metric, dim1, dim2, value)
+    SELECT {metric}, {dim1}, {dim2}, {value} WHERE {condition}
+    ON CONFLICT (metric, dim1, dim2) DO UPDATE SET value = value + excluded.value;
+'''
+
+# Is there another link of the same movie and type besides the row being changed?
+OTHER_LINK_OF_TYPE = '''
+    EXISTS (
+        SELECT 1 FROM download_links d
+        WHERE d.movie_id = {row}.movie_id AND COALESCE(d.type, '') = COALESCE({row}.type, '') AND d.id != {row}.id
+    )
+'''
+
+
+def movie_aggregate_statements(row, sign):
+    """Upserts adding (sign=1) or removing (sign=-1) one movie's contributions"""
+    return ''.join(
+        UPSERT_AGGREGATE.format(
+            metric=metric,
+            dim1=dim1.format(row=row),
+            dim2=dim2.format(row=row),
+            value=f"{sign} * {value}",
+            condition=condition.format(row=row)
+        )
+        for metric, dim1, dim2, value, condition in MOVIE_AGGREGATES
+    )
+
+
+def link_aggregate_statements(row, sign):
+    """Upserts adding (sign=1) or removing (sign=-1) one download link"""
+    link_type = f"COALESCE({row}.type, '')"
+    return (
+        UPSERT_AGGREGATE.format(metric="'link_links'", dim1=link_type, dim2="''", value=sign, condition='1')
+        + UPSERT_AGGREGATE.format(
+            metric="'link_movies'", dim1=link_type, dim2="''", value=sign,
+            condition='NOT ' + OTHER_LINK_OF_TYPE.format(row=row)
+        )
+    )
+
+
+def aggregate_source_query():
+    """Compute every aggregate from the base tables (metric, dim1, dim2, value)"""
+    selects = [
+        f"SELECT {metric}, {dim1.format(row='m')}, {dim2.format(row='m')}, SUM({value}) "
+        f"FROM movies m WHERE {condition.format(row='m')} GROUP BY 2, 3"
+        for metric, dim1, dim2, value, condition in MOVIE_AGGREGATES
+    ]
+    selects.append("SELECT 'link_links', COALESCE(type, ''), '', COUNT(*) FROM download_links GROUP BY 2")
+    selects.append("SELECT 'link_movies', COALESCE(type, ''), '', COUNT(DISTINCT movie_id) FROM download_links GROUP BY 2")
+    return '\nUNION ALL\n'.join(selects)
+
+
+def ensure_aggregates(conn):
+    """Create movie_aggregates and the triggers that maintain it incrementally"""
+    created = not table_exists(conn, 'movie_aggregates')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_aggregates (
+            metric TEXT NOT NULL,
+            dim1 TEXT NOT NULL,
+            dim2 TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (metric, dim1, dim2)
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movie_aggregates_ai AFTER INSERT ON movies BEGIN
+            {movie_aggregate_statements('new', 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movie_aggregates_ad AFTER DELETE ON movies BEGIN
+            {movie_aggregate_statements('old', -1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS movie_aggregates_au
+        AFTER UPDATE OF imdb_rating, douban_rating, category_type, category, year ON movies BEGIN
+            {movie_aggregate_statements('old', -1)}
+            {movie_aggregate_statements('new', 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS link_aggregates_ai AFTER INSERT ON download_links BEGIN
+            {link_aggregate_statements('new', 1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS link_aggregates_ad AFTER DELETE ON download_links BEGIN
+            {link_aggregate_statements('old', -1)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS link_aggregates_au AFTER UPDATE OF movie_id, type ON download_links
+        WHEN old.movie_id IS NOT new.movie_id OR old.type IS NOT new.type BEGIN
+            {link_aggregate_statements('old', -1)}
+            {link_aggregate_statements('new', 1)}
+        END
+    ''')
+
+    if created:
+        rebuild_aggregates(conn)
+        logger.info("Created movie_aggregates table")
+
+
+def rebuild_aggregates(conn):
+    """Recompute movie_aggregates from scratch (use when the counts have drifted)"""
+    conn.execute('DELETE FROM movie_aggregates')
+    conn.execute(
+        'INSERT INTO movie_aggregates (metric, dim1, dim2, value) ' + aggregate_source_query()
+    )
+
+
+# Related titles kept per movie by rebuild_neighbors
+NEIGHBORS_TOP_K = 12
+
+# Same-category titles (most recent first) scored for every movie
+NEIGHBOR_CATEGORY_CANDIDATES = 200
+
+# Directors / cast members credited on more titles than this are too generic to link movies
+NEIGHBOR_MAX_PEOPLE_POSTING = 500
+
+# Ids per IN (...) list when reading and rewriting stored lists
+NEIGHBOR_BATCH_SIZE = 500
+
+# Similarity weights of the shared attributes
+NEIGHBOR_WEIGHTS = {
+    'genre': 3.0,
+    'director': 3.0,
+    'cast': 1.5,
+    'country': 0.5,
+    'category': 1.0,
+    'rating': 0.1,
+}
+
+PEOPLE_SEPARATORS = re.compile(r'\s*[/,，、|;；]\s*')
+
+
+def split_people(text):
+    """Distinct names from a list, a JSON list or a separated string, as stored by the crawler"""
+    if not text:
+        return []
+    if isinstance(text, list):
+        names = text
+    else:
+        try:
+            names = json.loads(text)
+        except (TypeError, ValueError):
+            names = PEOPLE_SEPARATORS.split(text)
+        if not isinstance(names, list):
+            names = PEOPLE_SEPARATORS.split(text)
+    return list(dict.fromkeys(name.strip() for name in names if isinstance(name, str) and name.strip()))
+
+
+def ensure_neighbor_table(conn):
+    """Precomputed related titles, read by /api/movie/<id> with one primary key range"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_neighbors (
+            movie_id TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id TEXT NOT NULL,
+            score REAL NOT NULL,
+            PRIMARY KEY (movie_id, rank)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS movie_neighbors_ad AFTER DELETE ON movies BEGIN
+            DELETE FROM movie_neighbors WHERE movie_id = old.id;
+        END
+    ''')
+    # Lists holding a title, found when update_neighbors rescores around it
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_neighbors_neighbor ON movie_neighbors (neighbor_id)')
+
+
+def load_neighbor_features(conn):
+    """Similarity features of every movie, with the category and people postings candidates come from"""
+    rows = conn.execute('''
+        SELECT id, category_type, category, genre, director, "cast", country,
+               imdb_score, douban_score
+        FROM movies
+        ORDER BY publish_ts DESC, id DESC
+    ''').fetchall()
+
+    movies = {}
+    by_category = defaultdict(list)
+    by_person = defaultdict(list)
+    for movie_id, category_type, category, genre, director, cast, country, imdb, douban in rows:
+        directors = set(split_people(director))
+        actors = set(split_people(cast))
+        rating = max(imdb or 0, douban or 0)
+        movies[movie_id] = (
+            (category_type, category), set(split_people(genre)), directors, actors,
+            (country or '').strip(), rating
+        )
+        by_category[(category_type, category)].append(movie_id)
+        for name in directors:
+            by_person[('director', name)].append(movie_id)
+        for name in actors:
+            by_person[('cast', name)].append(movie_id)
+    return movies, by_category, by_person
+
+
+def people_postings(movie, by_person):
+    """Postings of the directors and actors of a movie that are specific enough to link titles"""
+    _, _, directors, actors, _, _ = movie
+    keys = [('director', name) for name in directors] + [('cast', name) for name in actors]
+    return [by_person[key] for key in keys if len(by_person[key]) <= NEIGHBOR_MAX_PEOPLE_POSTING]
+
+
+def score_neighbors(movie, other_ids, movies):
+    """(score, id) of each of other_ids as a related title of a movie"""
+    category_key, genres, directors, actors, country, _ = movie
+    weights = NEIGHBOR_WEIGHTS
+    scored = []
+    for other_id in other_ids:
+        other_category, other_genres, other_directors, other_actors, other_country, other_rating = movies[other_id]
+        score = 0.0
+        if genres and other_genres:
+            score += weights['genre'] * len(genres & other_genres) / len(genres | other_genres)
+        score += weights['director'] * len(directors & other_directors)
+        score += weights['cast'] * len(actors & other_actors)
+        if country and country == other_country:
+            score += weights['country']
+        if category_key == other_category:
+            score += weights['category']
+        score += weights['rating'] * other_rating
+        scored.append((round(score, 4), other_id))
+    return scored
+
+
+def top_neighbors(movie_id, movies, by_category, by_person, top_k):
+    """(score, id) of the top-k related titles of a movie, best first"""
+    movie = movies[movie_id]
+    # Candidates: recent titles of the same category plus everything sharing a director or actor
+    candidates = set(by_category[movie[0]][:NEIGHBOR_CATEGORY_CANDIDATES])
+    for posting in people_postings(movie, by_person):
+        candidates.update(posting)
+    candidates.discard(movie_id)
+    return heapq.nlargest(top_k, score_neighbors(movie, candidates, movies))
+
+
+def write_neighbors(conn, lists):
+    """Store the related titles of the movies in lists ({movie id: [(score, id)]}), whose old rows are gone"""
+    conn.executemany(
+        'INSERT INTO movie_neighbors (movie_id, rank, neighbor_id, score) VALUES (?, ?, ?, ?)',
+        (
+            (movie_id, rank, other_id, score)
+            for movie_id, top in lists.items()
+            for rank, (score, other_id) in enumerate(top)
+        )
+    )
+
+
+def rebuild_neighbors(conn, top_k=NEIGHBORS_TOP_K):
+    """Recompute the top-k related titles of every movie from shared genre, people, country and rating"""
+    movies, by_category, by_person = load_neighbor_features(conn)
+    lists = {movie_id: top_neighbors(movie_id, movies, by_category, by_person, top_k) for movie_id in movies}
+    conn.execute('DELETE FROM movie_neighbors')
+    write_neighbors(conn, lists)
+    return len(movies)
+
+
+def update_neighbors(conn, movie_ids, top_k=NEIGHBORS_TOP_K):
+    """Refresh related titles after movie_ids were added or changed, instead of rebuilding every list
+
+    The changed titles, and the titles listing one of them (or a title a new one
+    pushed out of its category's candidate window), are rescored in full. Any
+    other title with a changed one among its candidates only scores that pair
+    and merges it into its stored list. Returns the number of lists rewritten.
+    """
+    if conn.execute('SELECT 1 FROM movie_neighbors LIMIT 1').fetchone() is None:
+        return rebuild_neighbors(conn, top_k)
+
+    movies, by_category, by_person = load_neighbor_features(conn)
+    changed = [movie_id for movie_id in dict.fromkeys(movie_ids) if movie_id in movies]
+    if not changed:
+        return 0
+    changed_set = set(changed)
+
+    # Titles whose stored list may rank a changed or displaced title differently
+    displaced = set()
+    for category_key in {movies[movie_id][0] for movie_id in changed}:
+        window = by_category[category_key]
+        entered = len(changed_set.intersection(window[:NEIGHBOR_CATEGORY_CANDIDATES]))
+        displaced.update(window[NEIGHBOR_CATEGORY_CANDIDATES:NEIGHBOR_CATEGORY_CANDIDATES + entered])
+    rescore = set(changed_set)
+    listed = changed + list(displaced)
+    for start in range(0, len(listed), NEIGHBOR_BATCH_SIZE):
+        batch = listed[start:start + NEIGHBOR_BATCH_SIZE]
+        rescore.update(
+            row[0] for row in conn.execute(
+                f"SELECT DISTINCT movie_id FROM movie_neighbors WHERE neighbor_id IN ({','.join('?' * len(batch))})",
+                batch
+            )
+        )
+    rescore &= movies.keys()
+
+    # Every other title that has a changed one among its candidates
+    added = defaultdict(set)
+    for movie_id in changed:
+        holders = set()
+        window = by_category[movies[movie_id][0]]
+        if movie_id in window[:NEIGHBOR_CATEGORY_CANDIDATES]:
+            holders.update(window)
+        for posting in people_postings(movies[movie_id], by_person):
+            holders.update(posting)
+        for holder in holders - rescore:
+            added[holder].add(movie_id)
+
+    stored = defaultdict(list)
+    holders = list(added)
+    for start in range(0, len(holders), NEIGHBOR_BATCH_SIZE):
+        batch = holders[start:start + NEIGHBOR_BATCH_SIZE]
+        for movie_id, other_id, score in conn.execute(
+            f"SELECT movie_id, neighbor_id, score FROM movie_neighbors WHERE movie_id IN ({','.join('?' * len(batch))})",
+            batch
+        ):
+            stored[movie_id].append((score, other_id))
+
+    lists = {movie_id: top_neighbors(movie_id, movies, by_category, by_person, top_k) for movie_id in rescore}
+    for movie_id, others in added.items():
+        top = heapq.nlargest(top_k, stored[movie_id] + score_neighbors(movies[movie_id], others, movies))
+        if top != sorted(stored[movie_id], reverse=True):
+            lists[movie_id] = top
+
+    movie_ids = list(lists)
+    for start in range(0, len(movie_ids), NEIGHBOR_BATCH_SIZE):
+        batch = movie_ids[start:start + NEIGHBOR_BATCH_SIZE]
+        conn.execute(f"DELETE FROM movie_neighbors WHERE movie_id IN ({','.join('?' * len(batch))})", batch)
+    write_neighbors(conn, lists)
+    return len(lists)
+
+
+# Credits indexed in movie_people; a director also cast in the film gets both rows
+PEOPLE_ROLES = ('director', 'cast')
+
+
+def ensure_tag_tables(conn):
+    """Genre and people join tables for indexed /api/genre and /api/person listings
+
+    publish_ts is copied into the join tables so a listing is one index range
+    in publish order. Rows are written by index_movie_tags() whenever the
+    crawler saves a movie.
+    """
+    created = not table_exists(conn, 'movie_people')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_genres (
+            genre TEXT NOT NULL,
+            movie_id TEXT NOT NULL,
+            publish_ts INTEGER,
+            PRIMARY KEY (genre, movie_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_genres_publish_ts ON movie_genres (genre, publish_ts, movie_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres (movie_id)')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS people (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS movie_people (
+            person_id INTEGER NOT NULL,
+            role TEXT NOT NULL,
+            movie_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            publish_ts INTEGER,
+            PRIMARY KEY (person_id, role, movie_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_people_publish_ts ON movie_people (person_id, publish_ts, movie_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_people_role_publish_ts ON movie_people (person_id, role, publish_ts, movie_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_movie_people_movie ON movie_people (movie_id)')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS movie_tags_ad AFTER DELETE ON movies BEGIN
+            DELETE FROM movie_genres WHERE movie_id = old.id;
+            DELETE FROM movie_people WHERE movie_id = old.id;
+        END
+    ''')
+
+    if created:
+        rebuild_tags(conn)
+        logger.info("Created movie_genres / people / movie_people tables")
+
+
+def person_ids(conn, names, known=None):
+    """people.id of each name, inserting new people; known caches ids across calls"""
+    known = {} if known is None else known
+    ids = []
+    for name in names:
+        if name not in known:
+            conn.execute('INSERT OR IGNORE INTO people (name) VALUES (?)', (name,))
+            known[name] = conn.execute('SELECT id FROM people WHERE name = ?', (name,)).fetchone()[0]
+        ids.append(known[name])
+    return ids
+
+
+def index_movie_tags(conn, movie_id, genre, director, cast, publish_ts, known_people=None):
+    """Replace the genre and credit rows of one movie (genre/cast as lists or stored JSON)"""
+    conn.execute('DELETE FROM movie_genres WHERE movie_id = ?', (movie_id,))
+    conn.execute('DELETE FROM movie_people WHERE movie_id = ?', (movie_id,))
+
+    conn.executemany(
+        'INSERT INTO movie_genres (genre, movie_id, publish_ts) VALUES (?, ?, ?)',
+        [(name, movie_id, publish_ts) for name in split_people(genre)]
+    )
+
+    credits = []
+    for role, names in (('director', split_people(director)), ('cast', split_people(cast))):
+        for position, person_id in enumerate(person_ids(conn, names, known_people)):
+            credits.append((person_id, role, movie_id, position, publish_ts))
+    conn.executemany(
+        'INSERT OR IGNORE INTO movie_people (person_id, role, movie_id, position, publish_ts) VALUES (?, ?, ?, ?, ?)',
+        credits
+    )
+
+
+def rebuild_tags(conn):
+    """Recompute movie_genres / movie_people from the movies table"""
+    conn.execute('DELETE FROM movie_genres')
+    conn.execute('DELETE FROM movie_people')
+
+    known_people = dict(conn.execute('SELECT name, id FROM people'))
+    rows = conn.execute('SELECT id, genre, director, "cast", publish_date FROM movies').fetchall()
+    for movie_id, genre, director, cast, publish_date in rows:
+        index_movie_tags(conn, movie_id, genre, director, cast, parse_publish_ts(publish_date), known_people)
+
+    # People no longer credited anywhere
+    conn.execute('DELETE FROM people WHERE id NOT IN (SELECT person_id FROM movie_people)')
+
+
+def migrate_database(conn):
+    """Bring an existing catalog up to the current schema"""
+    ensure_sort_columns(conn)
+    ensure_search_index(conn)
+    ensure_listing_indexes(conn)
+    ensure_aggregates(conn)
+    ensure_neighbor_table(conn)
+    ensure_tag_tables(conn)
+    conn.commit()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description='Maintain the movies.db catalog schema')
+    parser.add_argument('--db', default='movies.db', help='Database file path')
+    parser.add_argument('--rebuild-search', action='store_true', help='Rebuild the full-text search index')
+    parser.add_argument('--rebuild-aggregates', action='store_true', help='Recompute category counts and statistics')
+    parser.add_argument('--backfill-sort-columns', action='store_true', help='Recompute typed rating/year/date columns')
+    parser.add_argument('--rebuild-neighbors', action='store_true', help='Recompute the related titles of every movie')
+    parser.add_argument('--rebuild-tags', action='store_true', help='Recompute the genre and people join tables')
+    parser.add_argument('--neighbors', type=int, default=NEIGHBORS_TOP_K, help='Related titles kept per movie')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    migrate_database(conn)
+
+    if args.rebuild_search and table_exists(conn, 'movies_fts'):
+        rebuild_search_index(conn)
+        conn.commit()
+        logger.info("Rebuilt movies_fts search index")
+
+    if args.rebuild_aggregates:
+        rebuild_aggregates(conn)
+        conn.commit()
+        logger.info("Rebuilt movie_aggregates")
+
+    if args.backfill_sort_columns:
+        backfill_sort_columns(conn)
+        conn.commit()
+        logger.info("Backfilled sort columns")
+
+    if args.rebuild_tags:
+        rebuild_tags(conn)
+        conn.commit()
+        logger.info("Rebuilt movie_genres / movie_people")
+
+    if args.rebuild_neighbors:
+        count = rebuild_neighbors(conn, args.neighbors)
+        conn.commit()
+        logger.info(f"Rebuilt related titles for {count} movies")
+
+    conn.close()
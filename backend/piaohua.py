@@ -13,6 +13,7 @@ from urllib.parse import urljoin
 import threading
 import os
 from datetime import datetime
+from movie_db import ensure_tag_tables, index_movie_tags, parse_publish_ts
 
 # Configure logging
 logging.basicConfig(
@@ -141,6 +142,9 @@ class PiaohuaGeminiScraper:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_links_movie_id ON download_links (movie_id)')
         
+        # Genre and people join tables
+        ensure_tag_tables(conn)
+        
         conn.commit()
         conn.close()
         logger.info(f"Database initialized at {self.db_path}")
@@ -545,6 +549,12 @@ class PiaohuaGeminiScraper:
                             link.get('type', '')
                         ))
                     
+                    # Genre and people join tables
+                    index_movie_tags(
+                        conn, movie_id, movie.get('genre', []), movie.get('director', ''),
+                        movie.get('cast', []), parse_publish_ts(movie.get('publish_date'))
+                    )
+                    
                 except Exception as e:
                     logger.error(f"保存电影失败 {movie.get('title', 'Unknown')}: {str(e)}")
                     skipped_count += 1
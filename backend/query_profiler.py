@@ -0,0 +1,184 @@
+"""
+SQL statement timing and opt-in profiling for the offline API (app.py)
+
+Connections opened with factory=ProfiledConnection time every statement
+(execution plus fetching) and hand it to their recorder. app.py always
+feeds a query-duration histogram; with profiling on, a QueryProfiler also
+logs statements slower than a threshold with their bound parameters, and
+keeps per-statement totals together with the EXPLAIN QUERY PLAN captured
+the first time each distinct statement runs.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r'\s+')
+
+# IN (?, ?, ?) lists of any length are folded into one statement
+PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+PLANNED_STATEMENTS = ('SELECT', 'WITH')
+
+
+def normalize_sql(sql):
+    """Statement text with whitespace and placeholder lists collapsed"""
+    sql = WHITESPACE.sub(' ', sql).strip()
+    return PLACEHOLDER_LIST.sub('(?, ...)', sql)
+
+
+class QueryProfiler:
+    """Per-statement timings, slow-query log and captured query plans"""
+
+    def __init__(self, slow_ms=50.0, max_statements=500):
+        self.slow_ms = slow_ms
+        self.max_statements = max_statements
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, conn, sql, parameters, elapsed):
+        """Account one finished statement"""
+        elapsed_ms = elapsed * 1000
+        key = normalize_sql(sql)
+        slow = elapsed_ms >= self.slow_ms
+
+        with self._lock:
+            entry = self._statements.get(key)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    return
+                entry = self._statements[key] = {
+                    'sql': key,
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'slow_count': 0,
+                    'slowest_parameters': None,
+                    'plan': None
+                }
+            entry['count'] += 1
+            entry['total_ms'] += elapsed_ms
+            if elapsed_ms >= entry['max_ms']:
+                entry['max_ms'] = elapsed_ms
+                entry['slowest_parameters'] = list(parameters) if parameters else []
+            if slow:
+                entry['slow_count'] += 1
+            needs_plan = entry['plan'] is None
+
+        if slow:
+            logger.warning(f"Slow query {elapsed_ms:.1f} ms: {key} parameters={list(parameters) if parameters else []}")
+
+        if needs_plan:
+            plan = self.explain(conn, sql, parameters)
+            with self._lock:
+                entry['plan'] = plan
+
+    def explain(self, conn, sql, parameters):
+        """EXPLAIN QUERY PLAN lines of a statement (empty for non-queries)"""
+        if not sql.lstrip().upper().startswith(PLANNED_STATEMENTS):
+            return []
+        try:
+            # A plain cursor, so the plan query is not profiled itself
+            cursor = sqlite3.Cursor(conn)
+            rows = cursor.execute(f'EXPLAIN QUERY PLAN {sql}', parameters or ()).fetchall()
+            cursor.close()
+        except sqlite3.Error as e:
+            return [f'unavailable: {e}']
+        return [row[3] for row in rows]
+
+    def top(self, limit=20, order='total_ms'):
+        """Slowest statements, by total_ms, max_ms or mean_ms"""
+        with self._lock:
+            entries = [dict(entry) for entry in self._statements.values()]
+        for entry in entries:
+            entry['mean_ms'] = entry['total_ms'] / entry['count'] if entry['count'] else 0
+            for field in ('total_ms', 'max_ms', 'mean_ms'):
+                entry[field] = round(entry[field], 3)
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+        return entries[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor timing each statement from execute() until its rows are fetched"""
+
+    _statement = None
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is not None:
+            sql, parameters, elapsed = statement
+            self.connection.profiler.record(self.connection, sql, parameters, elapsed)
+
+    def _timed(self, method, *args):
+        started = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            if self._statement is not None:
+                sql, parameters, elapsed = self._statement
+                self._statement = (sql, parameters, elapsed + time.perf_counter() - started)
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        self._statement = (sql, parameters, 0.0)
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        self._statement = (sql, (), 0.0)
+        result = self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors (including conn.execute) report to a recorder such as a QueryProfiler
+
+    The recorder (profiler attribute) needs a record(conn, sql, parameters, elapsed) method.
+    """
+
+    profiler = None
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or ProfiledCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -19,12 +19,15 @@ except ImportError:
     print("Waitress not installed, falling back to Flask development server", flush=True)
 
 # Import the app
-from app_online import app
+from app_online import app, start_prewarmer
 
 if __name__ == '__main__':
     port = 8080
     host = '0.0.0.0'
     
+    # Keep home and category first pages cached before the renderer asks for them
+    start_prewarmer()
+    
     if USE_WAITRESS:
         # Use waitress for production - much faster startup
         print(f"Running on http://127.0.0.1:{port}", flush=True)
@@ -0,0 +1,73 @@
+"""
+Tests of the online API (app_online.py) against a stub upstream site
+
+Run from backend/ with: python -m unittest discover tests
+"""
+
+import http.server
+import os
+import sys
+import threading
+import unittest
+
+# In-memory response cache and no background scraping while testing
+os.environ['ONLINE_CACHE_PATH'] = ''
+os.environ['CACHE_PREWARM'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app_online  # noqa: E402
+
+
+class StubUpstream(http.server.BaseHTTPRequestHandler):
+    """Answers every page with the status the test sets on the server"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'upstream error'
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MovieDetailUpstreamErrorTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubUpstream)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.client = app_online.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get_movie(self, movie_id):
+        return self.client.get(f'/api/movie/{movie_id}?url={self.base_url}/html/dongzuo/2024/0101/{movie_id}.html')
+
+    def test_upstream_server_error_is_the_endpoints_500(self):
+        self.server.status = 500
+        response = self.get_movie('500500')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.get_json(), {
+            'status': 'error',
+            'message': 'Failed to fetch movie details'
+        })
+        self.assertIsNone(app_online.response_cache.get(('movie', '500500')))
+
+    def test_upstream_not_found_is_404(self):
+        self.server.status = 404
+        response = self.get_movie('404404')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json(), {
+            'status': 'error',
+            'message': 'Movie not found'
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,7 @@ from urllib.parse import urljoin
 import threading
 import os
 from datetime import datetime
+from movie_db import create_catalog_tables, index_movie_tags, migrate_database, sort_values, update_neighbors
 
 # Configure logging
 logging.basicConfig(
@@ -73,6 +74,9 @@ class DYTT8899Scraper:
         self.init_database()
         self.db_lock = threading.Lock()
         
+        # Movies written by this run, whose related titles are refreshed at the end
+        self.changed_movie_ids = set()
+        
         # Create data directory for intermediate files
         os.makedirs(self.data_dir, exist_ok=True)
         
@@ -103,56 +107,10 @@ class DYTT8899Scraper:
     def init_database(self):
         """Initialize SQLite database"""
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS movies (
-                id TEXT PRIMARY KEY,
-                title TEXT NOT NULL,
-                translated_name TEXT,
-                original_name TEXT,
-                year TEXT,
-                country TEXT,
-                genre TEXT,
-                language TEXT,
-                subtitles TEXT,
-                release_date TEXT,
-                imdb_rating TEXT,
-                douban_rating TEXT,
-                file_format TEXT,
-                video_size TEXT,
-                file_size TEXT,
-                duration TEXT,
-                director TEXT,
-                cast TEXT,
-                synopsis TEXT,
-                poster TEXT,
-                screenshots TEXT,
-                category TEXT,
-                category_type TEXT,
-                publish_date TEXT,
-                page_url TEXT,
-                scrape_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                raw_data TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS download_links (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                movie_id TEXT NOT NULL,
-                quality TEXT,
-                link TEXT NOT NULL,
-                type TEXT,
-                FOREIGN KEY (movie_id) REFERENCES movies (id)
-            )
-        ''')
         
-        # Create indexes
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_category ON movies (category)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_movies_category_type ON movies (category_type)')
-        cursor.execute('CREATE INDEX IF NOT EXISTS idx_download_links_movie_id ON download_links (movie_id)')
+        # Base tables, then the indexes and derived tables the API reads
+        create_catalog_tables(conn)
+        migrate_database(conn)
         
         conn.commit()
         conn.close()
@@ -453,6 +411,7 @@ class DYTT8899Scraper:
                     genre_str = json.dumps(movie.get('genre', []), ensure_ascii=False) if isinstance(movie.get('genre'), list) else movie.get('genre', '')
                     cast_str = json.dumps(movie.get('cast', []), ensure_ascii=False) if isinstance(movie.get('cast'), list) else movie.get('cast', '')
                     screenshots_str = json.dumps(movie.get('screenshots', []), ensure_ascii=False) if movie.get('screenshots') else None
+                    sort_data = sort_values(movie)
                     
                     # Insert or update movie
                     if is_update:
@@ -462,7 +421,8 @@ class DYTT8899Scraper:
                                 genre = ?, language = ?, subtitles = ?, release_date = ?, imdb_rating = ?,
                                 douban_rating = ?, file_format = ?, video_size = ?, file_size = ?, duration = ?,
                                 director = ?, cast = ?, synopsis = ?, poster = ?, screenshots = ?, category = ?,
-                                category_type = ?, publish_date = ?, page_url = ?, raw_data = ?
+                                category_type = ?, publish_date = ?, page_url = ?, raw_data = ?,
+                                imdb_score = ?, douban_score = ?, year_int = ?, publish_ts = ?
                             WHERE id = ?
                         ''', (
                             movie.get('title', ''),
@@ -490,6 +450,10 @@ class DYTT8899Scraper:
                             movie.get('publish_date', ''),
                             movie.get('page_url', ''),
                             json.dumps(movie, ensure_ascii=False),
+                            sort_data['imdb_score'],
+                            sort_data['douban_score'],
+                            sort_data['year_int'],
+                            sort_data['publish_ts'],
                             movie_id
                         ))
                     else:
@@ -499,8 +463,9 @@ class DYTT8899Scraper:
                                 genre, language, subtitles, release_date, imdb_rating,
                                 douban_rating, file_format, video_size, file_size, duration,
                                 director, cast, synopsis, poster, screenshots, category,
-                                category_type, publish_date, page_url, raw_data
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                category_type, publish_date, page_url, raw_data,
+                                imdb_score, douban_score, year_int, publish_ts
+                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                         ''', (
                             movie_id,
                             movie.get('title', ''),
@@ -527,7 +492,11 @@ class DYTT8899Scraper:
                             movie.get('category_type', ''),
                             movie.get('publish_date', ''),
                             movie.get('page_url', ''),
-                            json.dumps(movie, ensure_ascii=False)
+                            json.dumps(movie, ensure_ascii=False),
+                            sort_data['imdb_score'],
+                            sort_data['douban_score'],
+                            sort_data['year_int'],
+                            sort_data['publish_ts']
                         ))
                     
                     # Delete old download links
@@ -545,6 +514,13 @@ class DYTT8899Scraper:
                             link.get('type', '')
                         ))
                     
+                    # Genre and people join tables
+                    index_movie_tags(
+                        conn, movie_id, movie.get('genre', []), movie.get('director', ''),
+                        movie.get('cast', []), sort_data['publish_ts']
+                    )
+                    self.changed_movie_ids.add(movie_id)
+                    
                 except Exception as e:
                     logger.error(f"保存电影失败 {movie.get('title', 'Unknown')}: {str(e)}")
                     skipped_count += 1
@@ -666,6 +642,15 @@ class DYTT8899Scraper:
                 logger.error(f"处理分类 {category_id} 失败: {str(e)}")
                 results[category_id] = 0
         
+        # 更新本次写入电影相关的推荐
+        if self.changed_movie_ids:
+            conn = sqlite3.connect(self.db_path)
+            count = update_neighbors(conn, self.changed_movie_ids)
+            conn.commit()
+            conn.close()
+            self.changed_movie_ids.clear()
+            logger.info(f"相关推荐已更新: {count} 部电影")
+        
         # 输出总结
         logger.info(f"\n{'='*60}")
         logger.info(f"阶段2 处理完成!")
@@ -0,0 +1,163 @@
+"""
+Asynchronous upstream HTTP client behind the online API's scraper (app_online.py)
+
+One asyncio event loop, running on a daemon thread, owns a pooled keep-alive
+httpx.AsyncClient (HTTP/2 when the h2 package is installed). Blocking callers
+hand it coroutines with run(); fan-outs such as the home page gather all of
+their fetches as tasks on the loop, each under its own deadline, so a few
+server threads can wait on many slow pages at once instead of each request
+spinning up a thread pool. Without httpx, fetches fall back to a pooled
+requests.Session on a bounded thread executor behind the same interface.
+"""
+
+import asyncio
+import importlib.util
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # optional, requests is always available
+    httpx = None
+
+HTTP2_AVAILABLE = httpx is not None and importlib.util.find_spec('h2') is not None
+
+# Connection pool shared by every upstream fetch
+UPSTREAM_MAX_CONNECTIONS = int(os.environ.get('UPSTREAM_MAX_CONNECTIONS', 20))
+UPSTREAM_MAX_KEEPALIVE = int(os.environ.get('UPSTREAM_MAX_KEEPALIVE', 10))
+UPSTREAM_TIMEOUT = float(os.environ.get('UPSTREAM_TIMEOUT', 10))
+
+
+class UpstreamError(Exception):
+    """A fetch that failed, timed out or returned an error status (kept in .status, None otherwise)"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class AsyncUpstream:
+    """Pooled upstream client on a private event loop, usable from any thread
+
+    on_fetch(url, status, elapsed) is called after every fetch attempt,
+    status being the HTTP status or 'error'.
+    """
+
+    def __init__(self, headers, timeout=UPSTREAM_TIMEOUT, max_connections=UPSTREAM_MAX_CONNECTIONS,
+                 max_keepalive=UPSTREAM_MAX_KEEPALIVE, on_fetch=None):
+        self.headers = dict(headers)
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.on_fetch = on_fetch
+        self._loop = None
+        self._client = None
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._fetches = 0
+        self._in_flight = 0
+
+    @property
+    def backend(self):
+        """Name of the HTTP client in use"""
+        return 'httpx' if httpx is not None else 'requests'
+
+    def _ensure_loop(self):
+        """Start the event loop thread and the pooled client on first use"""
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            loop = asyncio.new_event_loop()
+            if httpx is not None:
+                self._client = httpx.AsyncClient(
+                    headers=self.headers,
+                    http2=HTTP2_AVAILABLE,
+                    follow_redirects=True,
+                    timeout=self.timeout,
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive
+                    )
+                )
+            else:
+                self._session = requests.Session()
+                self._session.headers.update(self.headers)
+                adapter = HTTPAdapter(pool_connections=self.max_keepalive, pool_maxsize=self.max_connections)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+                self._executor = ThreadPoolExecutor(max_workers=self.max_connections, thread_name_prefix='upstream')
+            threading.Thread(target=loop.run_forever, name='upstream-loop', daemon=True).start()
+            self._loop = loop
+            return loop
+
+    def run(self, coroutine, timeout=None):
+        """Run a coroutine on the upstream loop and wait for its result (from a non-loop thread)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
+
+    async def fetch(self, url, timeout=None):
+        """Body of a page as text, raising UpstreamError (concurrent callers are coalesced by the scraper)"""
+        timeout = timeout or self.timeout
+        self._fetches += 1
+        self._in_flight += 1
+        status = 'error'
+        started = time.perf_counter()
+        try:
+            if httpx is not None:
+                response = await self._client.get(url, timeout=timeout)
+                status = response.status_code
+                response.raise_for_status()
+                response.encoding = 'utf-8'
+                return response.text
+            response = await asyncio.get_running_loop().run_in_executor(
+                self._executor, partial(self._session.get, url, timeout=timeout)
+            )
+            status = response.status_code
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            return response.text
+        except Exception as e:
+            raise UpstreamError(f"{url}: {e}", status if isinstance(status, int) else None) from e
+        finally:
+            self._in_flight -= 1
+            if self.on_fetch is not None:
+                self.on_fetch(url, status, time.perf_counter() - started)
+
+    async def fetch_many(self, urls, deadline=None):
+        """Bodies of several pages fetched concurrently, an UpstreamError for any that failed or missed the deadline"""
+        deadline = deadline or self.timeout
+
+        async def fetch_or_error(url):
+            try:
+                return await asyncio.wait_for(self.fetch(url), deadline)
+            except UpstreamError as e:
+                return e
+            except asyncio.TimeoutError:
+                return UpstreamError(f"{url}: exceeded the {deadline}s deadline")
+        return await asyncio.gather(*(fetch_or_error(url) for url in urls))
+
+    def get(self, url, timeout=None):
+        """Blocking fetch of one page"""
+        return self.run(self.fetch(url, timeout))
+
+    def get_many(self, urls, deadline=None):
+        """Blocking concurrent fetch of several pages, see fetch_many"""
+        return self.run(self.fetch_many(urls, deadline))
+
+    def stats(self):
+        """Client configuration and counters for the stats endpoint"""
+        return {
+            'backend': self.backend,
+            'http2': HTTP2_AVAILABLE,
+            'max_connections': self.max_connections,
+            'max_keepalive': self.max_keepalive,
+            'fetches': self._fetches,
+            'in_flight': self._in_flight
+        }
@@ -48,7 +48,7 @@ class MovieAPI {
    * @returns {Promise<Object>} Movies data with pagination
    */
   async getMoviesByCategory(category, page = 1) {
-    return this.request(`/movies/${category}?page=${page}`)
+    return this.request(`/movies/${category}?page=${page}&include=links,synopsis`)
   }
 
   /**
@@ -59,7 +59,7 @@ class MovieAPI {
    */
   async searchMovies(keyword, page = 1) {
     const encodedKeyword = encodeURIComponent(keyword)
-    return this.request(`/search?keyword=${encodedKeyword}&page=${page}`)
+    return this.request(`/search?keyword=${encodedKeyword}&page=${page}&include=links,synopsis`)
   }
 
   /**
@@ -68,7 +68,7 @@ class MovieAPI {
    * @returns {Promise<Object>} Latest movies data
    */
   async getLatestMovies(limit = 20) {
-    return this.request(`/latest?limit=${limit}`)
+    return this.request(`/latest?limit=${limit}&include=links,synopsis`)
   }
 
   /**
@@ -118,7 +118,7 @@ class AppleSearchPage extends React.Component {
     })
 
     try {
-      const response = await fetch(`http://localhost:8080/api/search?keyword=${encodeURIComponent(trimmedQuery)}&page=${page}`)
+      const response = await fetch(`http://localhost:8080/api/search?keyword=${encodeURIComponent(trimmedQuery)}&page=${page}&include=links,synopsis`)
       const data = await response.json()
       
       if (data.status === 'success') {
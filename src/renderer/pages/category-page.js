@@ -246,7 +246,7 @@ function CategoryPage({ state }) {
       }
       
       const response = await fetch(
-        `http://localhost:8080/api/movies/${categoryConfig.type}/${category}?page=${page}`
+        `http://localhost:8080/api/movies/${categoryConfig.type}/${category}?page=${page}&include=links,synopsis`
       )
       
       if (!response.ok) {
@@ -126,7 +126,7 @@ class NetflixHomePage extends React.Component {
   async loadAllMovies() {
     try {
       // Load all home page data in a single API call
-      const response = await fetch('http://localhost:8080/api/home')
+      const response = await fetch('http://localhost:8080/api/home?include=links,synopsis')
       const data = await response.json()
       
       if (data.status === 'success' && data.data) {
@@ -38,7 +38,7 @@ function SearchPage() {
     setError(null)
 
     try {
-      const response = await fetch(`http://localhost:8080/api/search?keyword=${encodeURIComponent(keyword)}&page=${page}`)
+      const response = await fetch(`http://localhost:8080/api/search?keyword=${encodeURIComponent(keyword)}&page=${page}&include=links,synopsis`)
       const data = await response.json()
       console.log('[SearchPage] Raw API response:', data)
       
@@ -19,7 +19,7 @@ class SimpleMoviePage extends React.Component {
   async loadMovies() {
     try {
       // 简单的API测试
-      const response = await fetch('http://localhost:8080/api/latest?limit=5')
+      const response = await fetch('http://localhost:8080/api/latest?limit=5&include=links,synopsis')
       const data = await response.json()
       
       const adaptedMovies = adaptMovieList(data.data?.movies || [])